@@ -3,11 +3,10 @@ from __future__ import annotations
 
 import argparse
 import logging
-import time
 from collections import defaultdict
 from datetime import datetime, date
 from zoneinfo import ZoneInfo
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
 from masphd.dao.schema import ensure_schema
 from masphd.io.paths import DATABASE
@@ -15,9 +14,10 @@ from masphd.dao.sqlite import connect_sqlite
 from masphd.hsp.client import HSPClient
 from masphd.hsp.parser import extract_service_locations
 from masphd.dao.actual_arrivals_hsp import (
+    PredRow,
     build_hsp_index_by_tiploc2,
-    make_actual_arrival_record,
-    upsert_actual_arrival,
+    make_actual_arrival_records_batch,
+    upsert_actual_arrivals_staged,
 )
 
 log = logging.getLogger(__name__)
@@ -58,16 +58,28 @@ def build_argparser() -> argparse.ArgumentParser:
         help="Max distinct RIDs to call HSP for in one run (default 2000).",
     )
     p.add_argument(
-        "--sleep",
+        "--concurrency",
+        type=int,
+        default=8,
+        help="Number of HSP requests in flight at once (default 8).",
+    )
+    p.add_argument(
+        "--max-rps",
         type=float,
         default=0.0,
-        help="Sleep seconds between HSP requests (default 0).",
+        help="Max HSP requests per second across all workers (default 0 = unlimited).",
     )
     p.add_argument(
         "--dry-run",
         action="store_true",
         help="Do not write to DB, just log actions.",
     )
+    p.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Write with synchronous=OFF (faster commits; the DB stays in WAL, but an OS crash "
+        "or power loss while running can lose or corrupt the latest writes).",
+    )
     p.add_argument(
         "--verbose",
         action="store_true",
@@ -76,17 +88,75 @@ def build_argparser() -> argparse.ArgumentParser:
     return p
 
 
-def _fetch_candidate_predictions(
+def _enter_bulk_mode(conn) -> int:
+    """
+    Switch the connection to synchronous=OFF (no fsync per commit).
+    journal_mode stays WAL: changing it needs exclusive access to the file,
+    which fails while another connection (e.g. the realtime runner) has it open.
+    Returns the previous synchronous level so it can be restored.
+    """
+    prev_sync = conn.execute("PRAGMA synchronous;").fetchone()[0]
+
+    conn.execute("PRAGMA synchronous=OFF;")
+    now = conn.execute("PRAGMA synchronous;").fetchone()[0]
+    if now != 0:
+        log.warning("PRAGMA synchronous=OFF did not apply (synchronous=%s); writing with normal syncing.", now)
+    return prev_sync
+
+
+def _exit_bulk_mode(conn, prev_sync: int) -> None:
+    """
+    Close any open transaction (rollback if not committed) and restore synchronous.
+    """
+    if conn.in_transaction:
+        conn.rollback()
+
+    conn.execute(f"PRAGMA synchronous={int(prev_sync)};")
+
+
+def _flush(conn, pending: List[Dict[str, Any]]) -> int:
+    """
+    Write one batch in its own short write transaction, so the write lock is
+    only held for the upsert itself (never across HSP round-trips).
+    """
+    conn.execute("BEGIN IMMEDIATE;")
+    try:
+        n = upsert_actual_arrivals_staged(conn, pending)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return n
+
+
+def _load_processed_keys(conn) -> Set[Tuple[Any, Any, Any, Any]]:
+    """
+    Unique keys (rid, first, second, planned_dep) already in actual_arrivals_hsp.
+    """
+    cur = conn.execute("SELECT rid, first, second, planned_dep FROM actual_arrivals_hsp")
+    return {tuple(r) for r in cur}
+
+
+def _iter_candidate_predictions(
     conn,
     *,
     before_date: str,
     limit_rows: int,
-) -> List[Dict[str, Any]]:
+) -> Iterator[PredRow]:
     """
-    Fetch only rows that:
+    Stream only rows that:
       - are from before_date (ssd < before_date)
       - are NOT already processed into actual_arrivals_hsp (by unique key)
+
+    Yields PredRow records, at most limit_rows.
+
+    The processed keys are loaded once into an in-memory set and predictions_actual
+    is streamed through it, so SQLite never has to build the anti-join.
+    A set (not a Bloom filter) is used on purpose: a false positive would silently
+    skip an unprocessed row. planned_dep=None matches None, like SQL `IS`.
     """
+    processed = _load_processed_keys(conn)
+
     sql = """
     SELECT
         p.rid, p.ssd, p.first, p.second, p.planned_dep, p.predicted_delay
@@ -94,23 +164,24 @@ def _fetch_candidate_predictions(
     WHERE
         p.ssd IS NOT NULL
         AND p.ssd < ?
-        AND NOT EXISTS (
-            SELECT 1
-            FROM actual_arrivals_hsp a
-            WHERE a.rid = p.rid
-              AND a.first = p.first
-              AND a.second = p.second
-              AND (
-                    (a.planned_dep IS NULL AND p.planned_dep IS NULL)
-                 OR (a.planned_dep = p.planned_dep)
-              )
-        )
     ORDER BY p.ssd ASC
-    LIMIT ?
     """
-    rows = conn.execute(sql, (before_date, limit_rows)).fetchall()
-    # sqlite.Row -> dict
-    return [dict(r) for r in rows]
+    if limit_rows <= 0:
+        return
+
+    n = 0
+    cur = conn.execute(sql, (before_date,))
+    try:
+        for r in cur:
+            row = PredRow(*r)
+            if (row.rid, row.first, row.second, row.planned_dep) in processed:
+                continue
+            yield row
+            n += 1
+            if n >= limit_rows:
+                break
+    finally:
+        cur.close()
 
 
 def main():
@@ -122,43 +193,50 @@ def main():
     )
 
     before_date = args.before_date or _today_london()
-    log.info("DB=%s | before_date=%s | dry_run=%s", args.db, before_date, args.dry_run)
+    log.info("DB=%s | before_date=%s | dry_run=%s | bulk=%s", args.db, before_date, args.dry_run, args.bulk)
 
     conn = connect_sqlite(args.db, wal=True, synchronous="NORMAL", busy_timeout_ms=10000, row_factory=True)
 
     ensure_schema(conn)
     conn.commit()
 
+    bulk = args.bulk and not args.dry_run
+    prev_sync: Optional[int] = None
+
     try:
-        candidates = _fetch_candidate_predictions(conn, before_date=before_date, limit_rows=args.limit_rows)
-        if not candidates:
+        if bulk:
+            prev_sync = _enter_bulk_mode(conn)
+
+        # Group prediction rows by RID (in one pass over the cursor) so we call HSP once per RID.
+        by_rid: Dict[str, List[PredRow]] = defaultdict(list)
+        n_candidates = 0
+        for r in _iter_candidate_predictions(conn, before_date=before_date, limit_rows=args.limit_rows):
+            n_candidates += 1
+            rid = r.rid
+            if rid:
+                by_rid[rid].append(r)
+
+        if not n_candidates:
             log.info("No unprocessed predictions_actual rows found (ssd < %s).", before_date)
             return
 
-        log.info("Candidate rows=%d", len(candidates))
-
-        # Group prediction rows by RID so we call HSP once per RID.
-        by_rid: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
-        for r in candidates:
-            rid = r.get("rid")
-            if rid:
-                by_rid[rid].append(r)
+        log.info("Candidate rows=%d", n_candidates)
 
         rids = list(by_rid.keys())[: args.max_rids]
         log.info("Distinct RIDs=%d (processing up to %d)", len(by_rid), len(rids))
 
-        hsp = HSPClient(timeout_secs=25.0)
+        concurrency = max(1, args.concurrency)
+        hsp = HSPClient(timeout_secs=25.0, pool_size=concurrency, max_requests_per_sec=args.max_rps)
 
         written = 0
         skipped_no_hsp = 0
         skipped_no_match = 0
         skipped_no_times = 0
 
-        for i, rid in enumerate(rids, start=1):
-            if args.sleep and args.sleep > 0:
-                time.sleep(args.sleep)
+        # HSP calls run in the client's worker threads; parsing and DB writes stay on this thread.
+        pending: List[Dict[str, Any]] = []
 
-            raw = hsp.get_service_details_raw(rid)
+        for i, (rid, raw) in enumerate(hsp.iter_service_details_raw(rids), start=1):
             if not raw:
                 skipped_no_hsp += len(by_rid[rid])
                 continue
@@ -171,13 +249,13 @@ def main():
             # Index by TIPLOC2 (converted from CRS) so it matches predictions_actual first/second.
             hsp_by_t2 = build_hsp_index_by_tiploc2(hsp_rows)
 
-            # Build and upsert one row per prediction row for this RID.
-            for pred_row in by_rid[rid]:
-                rec = make_actual_arrival_record(pred_row=pred_row, hsp_by_tiploc2=hsp_by_t2, tz=LONDON)
-
+            # Build one row per prediction row for this RID; upserts are flushed in batches.
+            pred_rows = by_rid[rid]
+            recs = make_actual_arrival_records_batch(pred_rows=pred_rows, hsp_by_tiploc2=hsp_by_t2, tz=LONDON)
+            for pred_row, rec in zip(pred_rows, recs):
                 if rec is None:
                     # Determine rough reason (best-effort)
-                    second = pred_row.get("second")
+                    second = pred_row.second
                     if not second or second not in hsp_by_t2:
                         skipped_no_match += 1
                     else:
@@ -188,16 +266,17 @@ def main():
                     written += 1
                     continue
 
-                upsert_actual_arrival(conn, rec)
-                written += 1
+                pending.append(rec)
 
-            # commit periodically (avoid huge transactions)
+            # flush + commit periodically (avoid huge transactions)
             if not args.dry_run and (i % 50 == 0):
-                conn.commit()
+                written += _flush(conn, pending)
+                pending.clear()
                 log.info("Progress: %d/%d RIDs | written=%d", i, len(rids), written)
 
-        if not args.dry_run:
-            conn.commit()
+        if pending:
+            written += _flush(conn, pending)
+            pending.clear()
 
         log.info(
             "Done. written=%d | skipped_no_hsp=%d | skipped_no_match=%d | skipped_no_times=%d",
@@ -208,6 +287,8 @@ def main():
         )
 
     finally:
+        if prev_sync is not None:
+            _exit_bulk_mode(conn, prev_sync)
         conn.close()
 
 
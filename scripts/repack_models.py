@@ -0,0 +1,95 @@
+# scripts/repack_models.py
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+from pathlib import Path
+
+import joblib
+
+from masphd.io.paths import MODELS
+from masphd.models.transformers import register_legacy_pickle_names
+
+log = logging.getLogger(__name__)
+
+
+def build_argparser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="masphd-repack-models",
+        description=(
+            "One-off pass: rewrite every .joblib model artifact uncompressed "
+            "(compress=0) so WeightedEnsemblePredictor can memory-map its arrays "
+            "(mmap_mode='r')."
+        ),
+    )
+    p.add_argument(
+        "--models-dir",
+        type=str,
+        default=str(MODELS),
+        help=(
+            "Folder with <FIRST>_<SECOND>_<MODEL>.joblib artifacts "
+            "(default: masphd.io.paths.MODELS)."
+        ),
+    )
+    p.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only list the artifacts that would be rewritten.",
+    )
+    return p
+
+
+def repack(path: Path) -> int:
+    """
+    Load one artifact and dump it back uncompressed via a temp file + atomic rename.
+    Returns the new file size in bytes.
+    """
+    artifact = joblib.load(path)
+
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        joblib.dump(artifact, tmp, compress=0)
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+    return path.stat().st_size
+
+
+def main():
+    args = build_argparser().parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s\t%(message)s",
+    )
+
+    register_legacy_pickle_names()
+
+    paths = sorted(Path(args.models_dir).glob("*.joblib"))
+    log.info("Found %d artifacts in %s", len(paths), args.models_dir)
+
+    done = 0
+    for path in paths:
+        before = path.stat().st_size
+        if args.dry_run:
+            log.info("Would repack %s (%d bytes)", path.name, before)
+            continue
+
+        try:
+            after = repack(path)
+        except Exception as e:
+            log.warning("Failed to repack %s: %s", path.name, e)
+            continue
+
+        done += 1
+        log.info("Repacked %s: %d -> %d bytes", path.name, before, after)
+
+    if not args.dry_run:
+        log.info("Done. Repacked %d/%d artifacts.", done, len(paths))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,77 @@
 import os
+from functools import lru_cache
 from pathlib import Path
+from typing import Any, Callable, Dict
+
 import yaml
 
+from masphd.io.pickle_cache import atomic_dump, load_if_fresh
+
 # --------------------------------------------------
 # Paths
 # --------------------------------------------------
 ROOT = Path(__file__).resolve().parents[2]
 CONFIG_DIR = ROOT / "configs"
+CONFIG_PATH = CONFIG_DIR / "config.yaml"
+
+# Parsed-config cache, refreshed whenever config.yaml is newer
+_CACHE_PATH = CONFIG_DIR / ".config.pkl"
+
+# C loader when PyYAML was built with libyaml
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 # --------------------------------------------------
-# Load YAML config (non-secret)
+# Load YAML config (non-secret), lazily on first use
 # --------------------------------------------------
-with open(CONFIG_DIR / "config.yaml", "r") as f:
-    _cfg = yaml.safe_load(f)
+@lru_cache(maxsize=1)
+def load_config() -> Dict[str, Any]:
+    # the cache holds the credentials too: written and only trusted as 0600
+    cfg = load_if_fresh(_CACHE_PATH, CONFIG_PATH, require_private=True)
+    if isinstance(cfg, dict):
+        return cfg
+
+    with open(CONFIG_PATH, "r") as f:
+        cfg = yaml.load(f, Loader=_YAML_LOADER)
+
+    atomic_dump(_CACHE_PATH, cfg, mode=0o600)
+    return cfg
+
+
+_SETTINGS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "DARWIN_TOPIC_HOST": lambda c: c["DARWIN_TOPIC_HOST"],
+    "DARWIN_TOPIC_PORT": lambda c: c["DARWIN_TOPIC_PORT"],
+
+    "DARWIN_TOPIC_NAME": lambda c: c["DARWIN_TOPIC_NAME"],
+    "DARWIN_HEARTBEAT_MS": lambda c: int(c.get("DARWIN_HEARTBEAT_MS", 15000)),
+    "DARWIN_RECONNECT_DELAY_SECS": lambda c: int(
+        c.get("DARWIN_RECONNECT_DELAY_SECS", 15)
+    ),
+    "DARWIN_SUBSCRIPTION_ID": lambda c: str(c.get("DARWIN_SUBSCRIPTION_ID", "1")),
+    "DARWIN_ACK_MODE": lambda c: str(c.get("DARWIN_ACK_MODE", "auto")),
 
+    "DARWIN_TOPIC_USERNAME": lambda c: c["DARWIN_TOPIC_USERNAME"],
+    "DARWIN_TOPIC_PASSWORD": lambda c: c["DARWIN_TOPIC_PASSWORD"],
 
-DARWIN_TOPIC_HOST = _cfg["DARWIN_TOPIC_HOST"]
-DARWIN_TOPIC_PORT = _cfg["DARWIN_TOPIC_PORT"]
+    "HSP_SERVICE_METRICS_URL": lambda c: c["HSP_SERVICE_METRICS_URL"],
+    "HSP_SERVICE_DETAILS_URL": lambda c: c["HSP_SERVICE_DETAILS_URL"],
+    "HSP_USERNAME": lambda c: c["HSP_USERNAME"],
+    "HSP_PASSWORD": lambda c: c["HSP_PASSWORD"],
+}
 
-DARWIN_TOPIC_NAME = _cfg["DARWIN_TOPIC_NAME"]
-DARWIN_HEARTBEAT_MS = int(_cfg.get("DARWIN_HEARTBEAT_MS", 15000))
-DARWIN_RECONNECT_DELAY_SECS = int(_cfg.get("DARWIN_RECONNECT_DELAY_SECS", 15))
-DARWIN_SUBSCRIPTION_ID = str(_cfg.get("DARWIN_SUBSCRIPTION_ID", "1"))
-DARWIN_ACK_MODE = str(_cfg.get("DARWIN_ACK_MODE", "auto"))
 
-DARWIN_TOPIC_USERNAME = _cfg["DARWIN_TOPIC_USERNAME"]
-DARWIN_TOPIC_PASSWORD = _cfg["DARWIN_TOPIC_PASSWORD"]
+def __getattr__(name: str) -> Any:
+    """
+    Resolve settings (e.g. `from masphd.config import DARWIN_TOPIC_HOST`) on
+    first access, so importing this module does not read config.yaml.
+    """
+    getter = _SETTINGS.get(name)
+    if getter is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getter(load_config())
+    globals()[name] = value
+    return value
 
-HSP_SERVICE_METRICS_URL = _cfg["HSP_SERVICE_METRICS_URL"]
-HSP_SERVICE_DETAILS_URL = _cfg["HSP_SERVICE_DETAILS_URL"]
-HSP_USERNAME = _cfg["HSP_USERNAME"]
-HSP_PASSWORD = _cfg["HSP_PASSWORD"]
 
 # # --------------------------------------------------
 # # Load secrets from environment
@@ -1,58 +1,93 @@
 # src/masphd/dao/actual_arrivals_hsp.py
 from __future__ import annotations
 
+import re
 import sqlite3
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
 
-from masphd.darwin.time_utils import combine_date_time_smart, diff_minutes_wrap
+from masphd.darwin.time_utils import combine_date_time_smart, diff_minutes_wrap, seconds_of_day
 from masphd.darwin.station_pairs import CRS_TO_TIPLOC2, PAIR_SET
 
 
 def _clean_str(v: Any) -> Optional[str]:
     if v is None:
         return None
-    if isinstance(v, str):
-        s = v.strip()
-        return s or None
+    if v.__class__ is str:
+        return v.strip() or None
     s = str(v).strip()
     return s or None
 
+
+_HHMM_RE = re.compile(r"(\d{2})(\d{2})")
+
+
+@lru_cache(maxsize=2048)
+def _normalise_hhmm(s: str) -> Optional[str]:
+    if ":" in s:
+        return s
+    m = _HHMM_RE.fullmatch(s)
+    return f"{m.group(1)}:{m.group(2)}" if m else None
+
+
 def _hhmm_to_hh_colon_mm(v: Any) -> Optional[str]:
     """
     Convert HSP time formats to Darwin-compatible ones.
 
     - HSP: "0657"  -> "06:57"
     - Darwin already: "06:57" or "06:57:30" -> unchanged
+
+    Results are cached per string (at most 1440 HHMM values exist per day).
     """
     s = _clean_str(v)
     if not s:
         return None
-    if ":" in s:
-        return s
-    if len(s) == 4 and s.isdigit():
-        return f"{s[:2]}:{s[2:]}"
-    return None
+    return _normalise_hhmm(s)
 
-def _crs_to_tiploc2(crs: Optional[str]) -> Optional[str]:
-    if not crs:
-        return None
-    return CRS_TO_TIPLOC2.get(crs)
+
+class PredRow(NamedTuple):
+    """
+    One candidate predictions_actual row (first/second are TIPLOC2).
+    """
+    rid: str
+    ssd: Optional[str]
+    first: str
+    second: str
+    planned_dep: Optional[str]
+    predicted_delay: Optional[float]
+
+
+# Positional layout of candidate rows read from predictions_actual
+PRED_ROW_FIELDS: Tuple[str, ...] = PredRow._fields
+
+
+def _pred_fields(pred_row: Any) -> Tuple[Any, ...]:
+    """
+    Accept a predictions_actual row either as a dict or as a positional
+    record in PRED_ROW_FIELDS order (PredRow / tuple).
+    """
+    if isinstance(pred_row, tuple):
+        return pred_row
+    if isinstance(pred_row, dict):
+        get = pred_row.get
+        return (get("rid"), get("ssd"), get("first"), get("second"), get("planned_dep"), get("predicted_delay"))
+    return tuple(pred_row)
 
 
-def build_hsp_index_by_tiploc2(hsp_rows: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+def build_hsp_index_by_tiploc2(hsp_rows: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
     """
     HSP rows are expected to be flat per-location rows (Darwin-like),
-    where row['tpl'] is CRS (confirmed by you).
+    where row['tpl'] is CRS (confirmed by you). Any iterable works,
+    so a generator can be passed without building a list first.
 
     Returns: tiploc2 -> row (last wins).
     """
-    out: Dict[str, Dict[str, Any]] = {}
-    for r in hsp_rows or []:
-        crs = _clean_str(r.get("tpl"))
-        t2 = _crs_to_tiploc2(crs)
-        if t2:
-            out[t2] = r
-    return out
+    c2t = CRS_TO_TIPLOC2.get
+    return {
+        t2: r
+        for r in hsp_rows or []
+        if (t2 := c2t((r.get("tpl") or "").strip())) is not None
+    }
 
 
 def compute_actual_arrival_delay_min(
@@ -99,13 +134,14 @@ def _is_main_journey_pair(first: Optional[str], second: Optional[str]) -> int:
 
 def make_actual_arrival_record(
     *,
-    pred_row: Dict[str, Any],
+    pred_row: Any,
     hsp_by_tiploc2: Dict[str, Dict[str, Any]],
     tz=None,
 ) -> Optional[Dict[str, Any]]:
     """
     Build one record for actual_arrivals_hsp from:
-      - a predictions_actual row (TIPLOC2 first/second)
+      - a predictions_actual row (TIPLOC2 first/second), as a PredRow,
+        a dict, or a tuple in PRED_ROW_FIELDS order
       - HSP rows indexed by TIPLOC2
 
     Rules:
@@ -115,11 +151,14 @@ def make_actual_arrival_record(
           * default 0
           * set 1 only when (first, second) is in STATION_PAIRS (PAIR_SET)
     """
-    rid = _clean_str(pred_row.get("rid"))
-    first = _clean_str(pred_row.get("first"))
-    second = _clean_str(pred_row.get("second"))
-    planned_dep = _clean_str(pred_row.get("planned_dep"))
-    ssd = _clean_str(pred_row.get("ssd"))
+    clean = _clean_str
+    rid, ssd, first, second, planned_dep, predicted_delay = _pred_fields(pred_row)
+
+    rid = clean(rid)
+    first = clean(first)
+    second = clean(second)
+    planned_dep = clean(planned_dep)
+    ssd = clean(ssd)
 
     if not rid or not first or not second:
         return None
@@ -155,40 +194,231 @@ def make_actual_arrival_record(
         # new flag field
         "is_main_journey": int(hsp_loc.get("is_main_journey") or 0),
 
-        "predicted_delay": pred_row.get("predicted_delay"),
+        "predicted_delay": predicted_delay,
 
         "planned_arr": planned_arr,
         "actual_arr": actual_arr,
         "actual_arr_delay": actual_arr_delay,
 
-        "toc_code": _clean_str(hsp_loc.get("toc_code")),
-        "hsp_location_crs": _clean_str(hsp_loc.get("tpl")),  # CRS used to match
-        "hsp_tpls": _clean_str(hsp_loc.get("hsp_tpls"))
+        "toc_code": clean(hsp_loc.get("toc_code")),
+        "hsp_location_crs": clean(hsp_loc.get("tpl")),  # CRS used to match
+        "hsp_tpls": clean(hsp_loc.get("hsp_tpls"))
     }
 
     return rec
 
 
-def upsert_actual_arrival(conn: sqlite3.Connection, rec: Dict[str, Any]) -> None:
+_DAY_SECS = 24 * 3600
+_ROLLOVER_SECS = 2 * 3600  # same as combine_date_time_smart(rollover_threshold_hours=2)
+
+
+def _delay_min_from_secs(planned: int, actual: int, base: Optional[int]) -> float:
     """
-    UPSERT into actual_arrivals_hsp so re-running daily updates existing rows.
+    Same rollover + wrap rules as compute_actual_arrival_delay_min, but on
+    seconds-of-day (all times share one ssd and tz, so no datetimes are needed).
     """
-    cols = list(rec.keys())
-    placeholders = ",".join(["?"] * len(cols))
-    col_list = ",".join(cols)
+    if base is not None and planned < base and base - planned > _ROLLOVER_SECS:
+        planned += _DAY_SECS
+    if actual < planned and planned - actual > _ROLLOVER_SECS:
+        actual += _DAY_SECS
 
+    minutes = (actual - planned) / 60.0
+    if minutes > 1200:
+        minutes -= 1440
+    if minutes < -1200:
+        minutes += 1440
+    return minutes
+
+
+def make_actual_arrival_records_batch(
+    *,
+    pred_rows: List[Any],
+    hsp_by_tiploc2: Dict[str, Dict[str, Any]],
+    tz=None,
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    Batch version of make_actual_arrival_record (same rules), for all
+    prediction rows of one RID.
+
+    Returns one entry per pred_row, None where no record can be built,
+    so callers can still count skip reasons.
+
+    - HSP location fields are normalised once per TIPLOC2.
+    - Delays use seconds-of-day arithmetic instead of building datetimes.
+      tz is accepted for signature parity: both times are in the same zone,
+      so it does not change the result.
+    """
+    clean = _clean_str
+    ssd_ok: Dict[str, bool] = {}
+    loc_cache: Dict[str, Optional[Tuple[Any, ...]]] = {}
+    out: List[Optional[Dict[str, Any]]] = []
+
+    for pred_row in pred_rows:
+        rid, ssd, first, second, planned_dep, predicted_delay = _pred_fields(pred_row)
+        rid = clean(rid)
+        first = clean(first)
+        second = clean(second)
+        planned_dep = clean(planned_dep)
+        ssd = clean(ssd)
+
+        if not rid or not first or not second:
+            out.append(None)
+            continue
+
+        if second in loc_cache:
+            loc = loc_cache[second]
+        else:
+            loc = None
+            hsp_loc = hsp_by_tiploc2.get(second)
+            if hsp_loc:
+                planned_arr = _hhmm_to_hh_colon_mm(hsp_loc.get("pta"))
+                actual_arr = _hhmm_to_hh_colon_mm(hsp_loc.get("ata"))
+                if planned_arr and actual_arr:
+                    loc = (
+                        planned_arr,
+                        actual_arr,
+                        seconds_of_day(planned_arr),
+                        seconds_of_day(actual_arr),
+                        int(hsp_loc.get("is_main_journey") or 0),
+                        clean(hsp_loc.get("toc_code")),
+                        clean(hsp_loc.get("tpl")),
+                        clean(hsp_loc.get("hsp_tpls")),
+                    )
+            loc_cache[second] = loc
+
+        if loc is None:
+            out.append(None)
+            continue
+
+        planned_arr, actual_arr, planned_secs, actual_secs, is_main, toc_code, crs, hsp_tpls = loc
+
+        actual_arr_delay: Optional[float] = None
+        if ssd and planned_secs is not None and actual_secs is not None:
+            ok = ssd_ok.get(ssd)
+            if ok is None:
+                ok = combine_date_time_smart(ssd, "00:00") is not None
+                ssd_ok[ssd] = ok
+            if ok:
+                base_s = _hhmm_to_hh_colon_mm(planned_dep) if planned_dep else None
+                base_secs = seconds_of_day(base_s) if base_s else None
+                actual_arr_delay = _delay_min_from_secs(planned_secs, actual_secs, base_secs)
+
+        out.append(
+            {
+                "rid": rid,
+                "ssd": ssd,
+                "first": first,      # TIPLOC2
+                "second": second,    # TIPLOC2
+                "planned_dep": planned_dep,
+                "is_main_journey": is_main,
+                "predicted_delay": predicted_delay,
+                "planned_arr": planned_arr,
+                "actual_arr": actual_arr,
+                "actual_arr_delay": actual_arr_delay,
+                "toc_code": toc_code,
+                "hsp_location_crs": crs,  # CRS used to match
+                "hsp_tpls": hsp_tpls,
+            }
+        )
+
+    return out
+
+
+def _on_conflict_sql(cols: Tuple[str, ...]) -> str:
+    """
+    ON CONFLICT clause shared by the row-wise and staged upserts.
+    """
     # update everything except the unique-key columns
     key_cols = {"rid", "first", "second", "planned_dep"}
     update_cols = [c for c in cols if c not in key_cols]
 
-    set_clause = ", ".join([f"{c}=excluded.{c}" for c in update_cols]) if update_cols else ""
+    if not update_cols:
+        update_sql = "DO NOTHING"
+    else:
+        set_clause = ", ".join([f"{c}=excluded.{c}" for c in update_cols])
+        # skip the UPDATE (no page write / WAL append) when nothing changed
+        changed = " OR ".join([f"actual_arrivals_hsp.{c} IS NOT excluded.{c}" for c in update_cols])
+        update_sql = f"DO UPDATE SET {set_clause}\n    WHERE {changed}"
+
+    return f"""ON CONFLICT(rid, first, second, planned_dep)
+    {update_sql}"""
+
 
-    sql = f"""
+@lru_cache(maxsize=32)
+def _upsert_sql(cols: Tuple[str, ...]) -> str:
+    """
+    Build (and cache) the UPSERT statement for one column signature.
+    """
+    placeholders = ",".join(["?"] * len(cols))
+    col_list = ",".join(cols)
+
+    return f"""
     INSERT INTO actual_arrivals_hsp ({col_list})
     VALUES ({placeholders})
-    ON CONFLICT(rid, first, second, planned_dep)
-    DO UPDATE SET {set_clause}
+    {_on_conflict_sql(cols)}
     """
 
+
+def upsert_actual_arrival(conn: sqlite3.Connection, rec: Dict[str, Any]) -> None:
+    """
+    UPSERT into actual_arrivals_hsp so re-running daily updates existing rows.
+    """
+    cols = tuple(rec.keys())
     vals = [rec[c] for c in cols]
-    conn.execute(sql, vals)
+    conn.execute(_upsert_sql(cols), vals)
+
+
+_STAGING_TABLE = "aah_stg"
+
+
+@lru_cache(maxsize=32)
+def _merge_sql(cols: Tuple[str, ...]) -> str:
+    """
+    Set-based version of _upsert_sql: one INSERT ... SELECT from the staging table.
+    """
+    col_list = ",".join(cols)
+
+    # ORDER BY keeps insertion order and also stops the parser reading ON CONFLICT as a join constraint
+    return f"""
+    INSERT INTO actual_arrivals_hsp ({col_list})
+    SELECT {col_list} FROM temp.{_STAGING_TABLE}
+    ORDER BY rowid
+    {_on_conflict_sql(cols)}
+    """
+
+
+def upsert_actual_arrivals_staged(conn: sqlite3.Connection, recs: Iterable[Dict[str, Any]]) -> int:
+    """
+    Batched version of upsert_actual_arrival.
+
+    Records are grouped by column set (dict key order may vary). Each group is
+    loaded with executemany into a TEMP staging table (no indexes, no
+    constraints, lives in the temp database), then merged with a single
+    INSERT ... SELECT ... ON CONFLICT DO UPDATE, so the unique index is
+    probed in one set-oriented statement. Rows are merged in
+    insertion order, so later duplicates win as they do row-wise.
+
+    The staging table is created on first use and emptied after each merge;
+    SQLite drops it when the connection closes.
+
+    Returns the number of records written.
+    """
+    conn.execute(
+        f"CREATE TEMP TABLE IF NOT EXISTS {_STAGING_TABLE} AS SELECT * FROM actual_arrivals_hsp WHERE 0"
+    )
+
+    groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    for rec in recs:
+        groups.setdefault(tuple(sorted(rec.keys())), []).append(rec)
+
+    n = 0
+    for cols, group in groups.items():
+        placeholders = ",".join(["?"] * len(cols))
+        conn.executemany(
+            f"INSERT INTO temp.{_STAGING_TABLE} ({','.join(cols)}) VALUES ({placeholders})",
+            ([rec[c] for c in cols] for rec in group),
+        )
+        conn.execute(_merge_sql(cols))
+        conn.execute(f"DELETE FROM temp.{_STAGING_TABLE}")
+        n += len(group)
+    return n
@@ -3,8 +3,9 @@ from __future__ import annotations
 
 import sqlite3
 import threading
+import time
 from queue import Queue, Empty
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 
 from .schema import ensure_schema
 from .sqlite import connect_sqlite
@@ -19,11 +20,26 @@ class RealTimeSQLiteStore:
 
     - One connection created and used in the writer thread only.
     - Inserts are queued to avoid blocking the realtime listener.
+    - The writer collects up to `batch_size` queued items (waiting at most
+      `flush_interval_secs` after the first one), writes them with one
+      executemany per (table, columns) and commits once per batch.
     - Clean shutdown via sentinel to avoid interpreter-shutdown crashes.
     """
 
-    def __init__(self, db_path: str | None = None, *, queue_maxsize: int = 5000):
+    def __init__(
+        self,
+        db_path: str | None = None,
+        *,
+        queue_maxsize: int = 5000,
+        batch_size: int = 200,
+        flush_interval_secs: float = 0.25,
+    ):
         self.db_path = db_path or "data/realtime_predictions.db"
+        self._batch_size = max(1, int(batch_size))
+        self._flush_interval_secs = max(0.0, float(flush_interval_secs))
+
+        # (table, cols) -> INSERT statement, built once per record shape
+        self._sql_cache: Dict[Tuple[str, Tuple[str, ...]], str] = {}
 
         self._q: "Queue[Tuple[Optional[str], Optional[Dict[str, Any]]]]" = Queue(maxsize=queue_maxsize)
         self._stop = threading.Event()
@@ -48,22 +64,44 @@ class RealTimeSQLiteStore:
                         break
                     continue
 
-                table, rec = item
+                batch = self._collect_batch(item)
 
                 try:
-                    # Sentinel means exit after draining prior items
-                    if table is None and rec is None:
-                        break
+                    # Sentinel means exit after writing prior items
+                    items = [it for it in batch if it is not _SENTINEL]
+                    stop = len(items) != len(batch)
 
-                    # Normal insert
-                    assert table is not None and rec is not None
-                    self._insert_with_conn(conn, table, rec)
-                    conn.commit()
+                    if items:
+                        self._insert_many_with_conn(conn, items)
+                        conn.commit()
                 finally:
-                    self._q.task_done()
+                    for _ in batch:
+                        self._q.task_done()
+
+                if stop:
+                    break
         finally:
             conn.close()
 
+    def _collect_batch(self, first: Tuple[Optional[str], Optional[Dict[str, Any]]]):
+        """
+        Gather up to batch_size items, starting from `first`.
+        Waits at most flush_interval_secs for more items; stops early on the
+        sentinel or when stop was requested.
+        """
+        batch = [first]
+        deadline = time.monotonic() + self._flush_interval_secs
+        while len(batch) < self._batch_size and batch[-1] is not _SENTINEL:
+            try:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._stop.is_set():
+                    batch.append(self._q.get_nowait())
+                else:
+                    batch.append(self._q.get(timeout=remaining))
+            except Empty:
+                break
+        return batch
+
     def close(self, *, drain: bool = True, join_timeout: Optional[float] = 10.0):
         """
         Stop the writer thread safely.
@@ -113,10 +151,29 @@ class RealTimeSQLiteStore:
             # queue full (or closing). We do not want to crash realtime pipeline.
             return False
 
+    def _insert_sql(self, table: str, cols: Tuple[str, ...]) -> str:
+        key = (table, cols)
+        sql = self._sql_cache.get(key)
+        if sql is None:
+            placeholders = ",".join(["?"] * len(cols))
+            sql = f"INSERT OR IGNORE INTO {table} ({','.join(cols)}) VALUES ({placeholders})"
+            self._sql_cache[key] = sql
+        return sql
+
     # Use conn created in writer thread
     def _insert_with_conn(self, conn: sqlite3.Connection, table: str, rec: Dict[str, Any]):
-        cols = list(rec.keys())
-        vals = [rec[c] for c in cols]
-        placeholders = ",".join(["?"] * len(cols))
-        sql = f"INSERT OR IGNORE INTO {table} ({','.join(cols)}) VALUES ({placeholders})"
-        conn.execute(sql, vals)
+        cols = tuple(rec.keys())
+        conn.execute(self._insert_sql(table, cols), [rec[c] for c in cols])
+
+    def _insert_many_with_conn(self, conn: sqlite3.Connection, items: List[Tuple[str, Dict[str, Any]]]):
+        """
+        Group queued (table, rec) items by (table, columns) and write each group
+        with a single executemany.
+        """
+        groups: Dict[Tuple[str, Tuple[str, ...]], List[List[Any]]] = {}
+        for table, rec in items:
+            cols = tuple(rec.keys())
+            groups.setdefault((table, cols), []).append([rec[c] for c in cols])
+
+        for (table, cols), rows in groups.items():
+            conn.executemany(self._insert_sql(table, cols), rows)
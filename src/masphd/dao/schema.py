@@ -2,32 +2,62 @@
 from __future__ import annotations
 
 import sqlite3
+from typing import Iterable, Set, Tuple
 
+# Bump whenever ensure_schema gains new DDL/migrations, so existing DBs re-run it.
+SCHEMA_VERSION = 2
 
-def _column_exists(conn: sqlite3.Connection, table: str, column: str) -> bool:
-    rows = conn.execute(f"PRAGMA table_info({table});").fetchall()
-    for r in rows:
-        # row format: (cid, name, type, notnull, dflt_value, pk)
-        if r[1] == column:
-            return True
-    return False
 
+# Additive migrations for actual_arrivals_hsp: (column definition, column name)
+_AAH_MIGRATIONS: Tuple[Tuple[str, str], ...] = (
+    ("is_main_journey INTEGER NOT NULL DEFAULT 0", "is_main_journey"),
+    ("predicted_delay REAL", "predicted_delay"),
+    ("planned_arr TEXT", "planned_arr"),
+    ("actual_arr TEXT", "actual_arr"),
+    ("actual_arr_delay REAL", "actual_arr_delay"),
+    ("toc_code TEXT", "toc_code"),
+    ("hsp_location_crs TEXT", "hsp_location_crs"),
+    ("hsp_tpls TEXT", "hsp_tpls"),
+)
 
-def _add_column_if_missing(conn: sqlite3.Connection, table: str, column_def_sql: str, column_name: str) -> None:
-    if not _column_exists(conn, table, column_name):
-        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column_def_sql};")
+
+def _existing_columns(conn: sqlite3.Connection, table: str) -> Set[str]:
+    # row format: (cid, name, type, notnull, dflt_value, pk)
+    return {r[1] for r in conn.execute(f"PRAGMA table_info({table});")}
+
+
+def _add_columns_if_missing(conn: sqlite3.Connection, table: str, migrations: Iterable[Tuple[str, str]]) -> None:
+    existing = _existing_columns(conn, table)
+    for column_def_sql, column_name in migrations:
+        if column_name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column_def_sql};")
+            existing.add(column_name)
+
+
+def _schema_version(conn: sqlite3.Connection) -> int:
+    return int(conn.execute("PRAGMA user_version;").fetchone()[0])
 
 
 def ensure_schema(conn: sqlite3.Connection) -> None:
     """
     Ensure all tables exist + apply small additive migrations.
     Uses provided conn only.
+
+    The applied version is stored in PRAGMA user_version; when it is already
+    current this returns after a single PRAGMA read.
+
+    `id` is a plain INTEGER PRIMARY KEY (rowid alias, no AUTOINCREMENT), so
+    inserts skip the sqlite_sequence update. ids stay increasing for these
+    append-only tables; values can be reused only after deleting the max row.
+    Existing DBs created with AUTOINCREMENT are left as they are.
     """
+    if _schema_version(conn) >= SCHEMA_VERSION:
+        return
 
     conn.execute(
         """
         CREATE TABLE IF NOT EXISTS predictions_all (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            id INTEGER PRIMARY KEY,
             created_at_utc TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ','now')),
 
             rid TEXT NOT NULL,
@@ -63,7 +93,7 @@ def ensure_schema(conn: sqlite3.Connection) -> None:
     conn.execute(
         """
         CREATE TABLE IF NOT EXISTS predictions_actual (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            id INTEGER PRIMARY KEY,
             created_at_utc TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ','now')),
 
             rid TEXT NOT NULL,
@@ -99,7 +129,7 @@ def ensure_schema(conn: sqlite3.Connection) -> None:
     conn.execute(
         """
         CREATE TABLE IF NOT EXISTS actual_arrivals_hsp (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            id INTEGER PRIMARY KEY,
             created_at_utc TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ','now')),
 
             rid TEXT NOT NULL,
@@ -125,13 +155,19 @@ def ensure_schema(conn: sqlite3.Connection) -> None:
         """
     )
 
+    # ---- indexes ----
+    # Covering index for the HSP candidate scan (WHERE ssd < ? ORDER BY ssd):
+    # served entirely from the index, no table lookups and no sort.
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_pa_ssd_cov
+        ON predictions_actual(ssd, rid, first, second, planned_dep, predicted_delay);
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_predictions_all_ssd ON predictions_all(ssd);")
+
     # ---- additive migrations (safe if table already exists) ----
-    # If you created the table earlier without is_main_journey, add it.
-    _add_column_if_missing(conn, "actual_arrivals_hsp", "is_main_journey INTEGER NOT NULL DEFAULT 0", "is_main_journey")
-    _add_column_if_missing(conn, "actual_arrivals_hsp", "predicted_delay REAL", "predicted_delay")
-    _add_column_if_missing(conn, "actual_arrivals_hsp", "planned_arr TEXT", "planned_arr")
-    _add_column_if_missing(conn, "actual_arrivals_hsp", "actual_arr TEXT", "actual_arr")
-    _add_column_if_missing(conn, "actual_arrivals_hsp", "actual_arr_delay REAL", "actual_arr_delay")
-    _add_column_if_missing(conn, "actual_arrivals_hsp", "toc_code TEXT", "toc_code")
-    _add_column_if_missing(conn, "actual_arrivals_hsp", "hsp_location_crs TEXT", "hsp_location_crs")
-    _add_column_if_missing(conn, "actual_arrivals_hsp", "hsp_tpls TEXT", "hsp_tpls")
\ No newline at end of file
+    # If you created the table earlier without e.g. is_main_journey, add it.
+    _add_columns_if_missing(conn, "actual_arrivals_hsp", _AAH_MIGRATIONS)
+
+    conn.execute(f"PRAGMA user_version={SCHEMA_VERSION};")
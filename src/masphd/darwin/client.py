@@ -24,6 +24,7 @@ class DarwinClient:
     def __init__(self, on_decoded: DecodedHandler):
         self._on_decoded = on_decoded
         self._conn: Optional[stomp.Connection12] = None
+        self._listener: Optional[DarwinListener] = None
         self._client_id = socket.getfqdn()
 
     def connect(self):
@@ -33,13 +34,12 @@ class DarwinClient:
             heartbeats=(DARWIN_HEARTBEAT_MS, DARWIN_HEARTBEAT_MS),
         )
 
-        self._conn.set_listener(
-            name="darwin",
-            listener=DarwinListener(
+        if self._listener is None:
+            self._listener = DarwinListener(
                 on_decoded=self._on_decoded,
                 reconnect_delay_secs=DARWIN_RECONNECT_DELAY_SECS,
-            ),
-        )
+            )
+        self._conn.set_listener(name="darwin", listener=self._listener)
 
         connect_headers = {"client-id": f"{DARWIN_TOPIC_USERNAME}-{self._client_id}"}
         subscribe_headers = {"activemq.subscriptionName": self._client_id}
@@ -89,3 +89,8 @@ class DarwinClient:
             log.info("Disconnecting")
             self._conn.disconnect()
             self._conn = None
+
+        # finish frames already received before the caller tears down downstream state
+        if self._listener is not None:
+            self._listener.close(drain=True)
+            self._listener = None
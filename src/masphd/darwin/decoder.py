@@ -1,16 +1,96 @@
 # src/masphd/darwin/decoder.py
 from __future__ import annotations
 
+import io
 import zlib
 from typing import Any, Dict, List, Tuple, Union
 
-from .parse_forecasts import extract_attr
-from .parse_schedules import extract_schedule
+# Optional dependency (recommended for the realtime feed):
+#   pip install isal
+# ISA-L inflate is a drop-in for zlib.decompress and several times faster.
+try:
+    from isal import isal_zlib as _zlib
+except Exception:
+    _zlib = zlib
+
+from .parse_forecasts import TS_TAG, parse_ts_elem
+from .parse_schedules import SCHEDULE_TAG, parse_schedule_elem
+from .xml_utils import iter_elements
+
+_FRAME_TAGS = (TS_TAG, SCHEDULE_TAG)
 
 
 def decompress_body(body: Union[bytes, bytearray]) -> bytes:
-    # Darwin PushPort frames are typically zlib/gzip wrapped
-    return zlib.decompress(body, zlib.MAX_WBITS | 32)
+    # Darwin PushPort frames are typically zlib/gzip wrapped (+32: auto-detect header)
+    return _zlib.decompress(body, _zlib.MAX_WBITS | 32)
+
+
+class _InflateReader(io.RawIOBase):
+    """
+    Read-only binary stream that inflates a zlib/gzip body on demand, so a parser
+    reading from it overlaps decompression with parsing and only ever holds a few
+    chunks of decompressed XML.
+    """
+
+    _IN_CHUNK = 64 * 1024
+
+    def __init__(self, body: Union[bytes, bytearray]):
+        self._src = memoryview(body)
+        self._pos = 0
+        self._d = _zlib.decompressobj(_zlib.MAX_WBITS | 32)
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not self._pending:
+            if self._pos >= len(self._src):
+                self._pending = self._d.flush()
+                if not self._pending:
+                    return 0
+                break
+            chunk = self._src[self._pos:self._pos + self._IN_CHUNK]
+            self._pos += len(chunk)
+            self._pending = self._d.decompress(chunk)
+
+        n = min(len(b), len(self._pending))
+        b[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+
+def open_body_stream(body: Union[bytes, bytearray]) -> io.BufferedReader:
+    """
+    Streaming counterpart of decompress_body: a file-like object yielding the XML.
+    """
+    return io.BufferedReader(_InflateReader(body))
+
+
+def _extract_frame(xml_data: Any) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    forecasts: List[Dict[str, Any]] = []
+    schedules: List[Dict[str, Any]] = []
+
+    # One parse for both: same output as extract_attr(xml_data) + extract_schedule(xml_data)
+    for elem in iter_elements(xml_data, _FRAME_TAGS):
+        if elem.tag == TS_TAG:
+            parse_ts_elem(elem, forecasts)
+        else:
+            parse_schedule_elem(elem, schedules)
+
+    return forecasts, schedules
+
+
+def decode_message_stream(body: Union[bytes, bytearray]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Like decode_message, but parses straight from the decompressing stream and
+    never materialises the XML bytes. Use it when the raw XML is not needed.
+
+    Returns:
+      forecasts_list, schedules_list
+    """
+    with open_body_stream(body) as stream:
+        return _extract_frame(stream)
 
 
 def decode_message(body: Union[bytes, bytearray]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], bytes]:
@@ -19,6 +99,5 @@ def decode_message(body: Union[bytes, bytearray]) -> Tuple[List[Dict[str, Any]],
       forecasts_list, schedules_list, xml_bytes
     """
     xml_bytes = decompress_body(body)
-    forecasts = extract_attr(xml_bytes)
-    schedules = extract_schedule(xml_bytes)
+    forecasts, schedules = _extract_frame(xml_bytes)
     return forecasts, schedules, xml_bytes
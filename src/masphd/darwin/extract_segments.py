@@ -3,43 +3,64 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Optional, Tuple
 
-from .station_pairs import STATION_PAIRS
-from .time_utils import combine_date_time_smart, diff_minutes_wrap, parse_hms
+from .station_pairs import STATION_PAIRS, TIPLOC2_INDEX, TIPLOC2_ROUTE
+from .time_utils import (
+    combine_date_time_fast,
+    diff_minutes_wrap,
+    parse_ssd_date,
+    seconds_of_day,
+)
+
+# -----------------------------
+# Field-priority key tuples (first non-empty wins)
+# -----------------------------
+_ARR_PLANNED: Tuple[str, ...] = ("pta", "wta")
+_DEP_PLANNED: Tuple[str, ...] = ("ptd", "wtd")
+_ARR_BEST: Tuple[str, ...] = ("arr_at", "arr_et", "arr_wet", "wta", "ata")
+_DEP_ACTUAL: Tuple[str, ...] = ("atd", "dep_at")
+_DEP_EST: Tuple[str, ...] = ("etd", "dep_et")
+_ARR_ACTUAL: Tuple[str, ...] = ("ata", "arr_at")
+_ARR_EST: Tuple[str, ...] = ("arr_et", "arr_wet")
+_VOTE_DEP: Tuple[str, ...] = ("ptd", "wtd", "dep_et", "dep_at")
+_VOTE_ARR: Tuple[str, ...] = ("pta", "wta", "arr_et", "arr_wet", "arr_at")
 
 
 # -----------------------------
 # Small helpers
 # -----------------------------
-def _first_non_empty(loc: Dict[str, Any], keys: List[str]) -> Optional[str]:
+def _first_non_empty(loc: Dict[str, Any], keys: Tuple[str, ...]) -> Optional[str]:
+    get = loc.get
     for k in keys:
-        v = loc.get(k)
+        v = get(k)
         if v:
             return v
     return None
 
 
-def _build_tpl_index(forecasts: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+def _build_route_locs(forecasts: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
     """
-    tpl -> location dict
+    Route position (TIPLOC2_INDEX) -> location dict; None where the RID has no row.
+    Rows for stations off the route are dropped.
     If duplicates occur, last wins (usually latest update).
     """
-    by_tpl: Dict[str, Dict[str, Any]] = {}
+    locs: List[Optional[Dict[str, Any]]] = [None] * len(TIPLOC2_ROUTE)
+    index_get = TIPLOC2_INDEX.get
     for row in forecasts:
-        tpl = row.get("tpl")
-        if tpl:
-            by_tpl[tpl] = row
-    return by_tpl
+        idx = index_get(row.get("tpl"))
+        if idx is not None:
+            locs[idx] = row
+    return locs
 
 
 # -----------------------------
 # Planned vs Actual pickers
 # -----------------------------
 def _pick_planned_arr(loc: Dict[str, Any]) -> Optional[str]:
-    return _first_non_empty(loc, ["pta", "wta"])
+    return _first_non_empty(loc, _ARR_PLANNED)
 
 
 def _pick_planned_dep(loc: Dict[str, Any]) -> Optional[str]:
-    return _first_non_empty(loc, ["ptd", "wtd"])
+    return _first_non_empty(loc, _DEP_PLANNED)
 
 
 def _pick_actual_arr(loc: Dict[str, Any]) -> Optional[str]:
@@ -47,25 +68,21 @@ def _pick_actual_arr(loc: Dict[str, Any]) -> Optional[str]:
     'Actual' in real time means 'best available operational value right now':
     actual arrives may be estimated/working-etc.
     """
-    return _first_non_empty(loc, ["arr_at", "arr_et", "arr_wet", "wta", "ata"])
+    return _first_non_empty(loc, _ARR_BEST)
 
 
 def _pick_confirmed_actual_dep(loc: Dict[str, Any]) -> Optional[str]:
     # confirmed actual departure
-    return _first_non_empty(loc, ["atd", "dep_at"])
+    return _first_non_empty(loc, _DEP_ACTUAL)
 
 
 def _pick_estimated_dep(loc: Dict[str, Any]) -> Optional[str]:
     # estimated departure (Darwin standard is 'etd')
-    return _first_non_empty(loc, ["etd", "dep_et"])
+    return _first_non_empty(loc, _DEP_EST)
 
 
 def _pick_working_dep(loc: Dict[str, Any]) -> Optional[str]:
-    return _first_non_empty(loc, ["wtd"])
-
-
-def _pick_planned_dep(loc: Dict[str, Any]) -> Optional[str]:
-    return _first_non_empty(loc, ["ptd"])
+    return loc.get("wtd") or None
 
 
 # -----------------------------
@@ -116,7 +133,7 @@ def _rid_matches_station_pairs_direction(schedules: List[Dict[str, Any]]) -> Opt
     return (origin == required_origin) and (dest == required_dest)
 
 
-def _is_reverse_by_vote(by_tpl: Dict[str, Dict[str, Any]]) -> bool:
+def _is_reverse_by_vote(locs: List[Optional[Dict[str, Any]]]) -> bool:
     """
     Fallback when schedules are missing:
     Vote using time-of-day only, using whatever is available:
@@ -128,31 +145,30 @@ def _is_reverse_by_vote(by_tpl: Dict[str, Dict[str, Any]]) -> bool:
     forward_votes = 0
     reverse_votes = 0
 
-    for a_code, b_code in STATION_PAIRS:
-        a = by_tpl.get(a_code)
-        b = by_tpl.get(b_code)
+    for i in range(len(STATION_PAIRS)):
+        a = locs[i]
+        b = locs[i + 1]
         if not a or not b:
             continue
 
-        dep_s = _first_non_empty(a, ["ptd", "wtd", "dep_et", "dep_at"])
-        arr_s = _first_non_empty(b, ["pta", "wta", "arr_et", "arr_wet", "arr_at"])
+        dep_s = _first_non_empty(a, _VOTE_DEP)
+        arr_s = _first_non_empty(b, _VOTE_ARR)
 
-        dep_t = parse_hms(dep_s)
-        arr_t = parse_hms(arr_s)
-        if dep_t is None or arr_t is None:
+        # integer seconds of day: no time objects, exact comparisons
+        dep_sec = seconds_of_day(dep_s)
+        arr_sec = seconds_of_day(arr_s)
+        if dep_sec is None or arr_sec is None:
             continue
 
-        dep_min = dep_t.hour * 60 + dep_t.minute + dep_t.second / 60.0
-        arr_min = arr_t.hour * 60 + arr_t.minute + arr_t.second / 60.0
-        delta = arr_min - dep_min
+        delta = arr_sec - dep_sec
 
         # midnight crossover safety: if it's huge negative, treat as next day
-        if delta < -720:
-            delta += 1440
+        if delta < -720 * 60:
+            delta += 1440 * 60
 
         if delta < 0:
             reverse_votes += 1
-            if delta <= -10:
+            if delta <= -10 * 60:
                 return True
         else:
             forward_votes += 1
@@ -201,33 +217,48 @@ def extract_segments(
     rid = forecasts[0].get("rid")
     ssd = forecasts[0].get("ssd")
 
-    by_tpl = _build_tpl_index(forecasts)
+    # Direction filtering (schedule endpoints if present, otherwise fallback vote).
+    # The schedule check needs no forecast index, so wrong-direction RIDs return
+    # before the pass over forecasts.
+    schedule_match = _rid_matches_station_pairs_direction(schedules or []) if drop_wrong_direction else None
+    if schedule_match is False:
+        return []
+
+    locs = _build_route_locs(forecasts)
 
-    # Direction filtering (schedule endpoints if present, otherwise fallback vote)
-    if drop_wrong_direction:
-        schedule_match = _rid_matches_station_pairs_direction(schedules or [])
-        if schedule_match is False:
+    if drop_wrong_direction and schedule_match is None:
+        if _is_reverse_by_vote(locs):
             return []
-        if schedule_match is None:
-            if _is_reverse_by_vote(by_tpl):
-                return []
+
+    # parse ssd once per RID instead of once per combined time
+    ssd_date = parse_ssd_date(ssd) if ssd else None
 
     out: List[Dict[str, Any]] = []
     first_station = STATION_PAIRS[0][0] if STATION_PAIRS else None
 
-    for a_code, b_code in STATION_PAIRS:
-        loc_a = by_tpl.get(a_code)
-        loc_b = by_tpl.get(b_code)
+    # The pickers are inlined below as `get(...) or get(...) or None` chains over the
+    # same key tuples as above (first non-empty wins, no helper call per field).
+    combine = combine_date_time_fast
+    diff = diff_minutes_wrap
+    append = out.append
+
+    # positional lookups: STATION_PAIRS[i] == (TIPLOC2_ROUTE[i], TIPLOC2_ROUTE[i + 1])
+    for i, (a_code, b_code) in enumerate(STATION_PAIRS):
+        loc_a = locs[i]
+        loc_b = locs[i + 1]
         if not loc_a or not loc_b:
             continue
 
-        planned_dep = _first_non_empty(loc_a, ["ptd", "wtd"])  # planned for delay baseline
+        a_get = loc_a.get
+        ptd = a_get("ptd")
+        wtd = a_get("wtd")
+        planned_dep = ptd or wtd or None  # planned for delay baseline
 
-        actual_dep_confirmed = _pick_confirmed_actual_dep(loc_a)
+        actual_dep_confirmed = a_get("atd") or a_get("dep_at") or None
         has_actual_dep = actual_dep_confirmed is not None
 
-        dep_estimate = _pick_estimated_dep(loc_a)
-        dep_working = _pick_working_dep(loc_a)
+        dep_estimate = a_get("etd") or a_get("dep_et") or None
+        dep_working = wtd or None
 
         # Choose best operational departure time
         if has_actual_dep:
@@ -240,38 +271,38 @@ def extract_segments(
             dep_time_for_prediction = dep_working
             dep_time_kind = "estimate"
         else:
-            dep_time_for_prediction = _pick_planned_dep(loc_a)
+            dep_time_for_prediction = ptd or None
             dep_time_kind = "estimate" if dep_time_for_prediction else "missing"
 
         # ---- compute departure delay (planned vs best available) ----
-        planned_dep_dt = combine_date_time_smart(ssd, planned_dep, tz=tz) if (ssd and planned_dep) else None
+        planned_dep_dt = combine(ssd_date, planned_dep, tz=tz) if (ssd_date and planned_dep) else None
         dep_pred_dt = (
-            combine_date_time_smart(ssd, dep_time_for_prediction, base_dt=planned_dep_dt, tz=tz)
-            if (ssd and dep_time_for_prediction and planned_dep_dt is not None)
+            combine(ssd_date, dep_time_for_prediction, base_dt=planned_dep_dt, tz=tz)
+            if (dep_time_for_prediction and planned_dep_dt is not None)
             else None
         )
-        departure_delay_min = diff_minutes_wrap(planned_dep_dt, dep_pred_dt)
+        departure_delay_min = diff(planned_dep_dt, dep_pred_dt)
 
         # ---- arrival delay at station A (for dwell delay) ----
-        planned_arr_a = _pick_planned_arr(loc_a)
+        planned_arr_a = a_get("pta") or a_get("wta") or None
 
         # confirmed actual arrival (rare mid-stream) + estimate arrival
-        actual_arr_confirmed = _first_non_empty(loc_a, ["ata", "arr_at"])
-        arr_estimate = _first_non_empty(loc_a, ["arr_et", "arr_wet"])
+        actual_arr_confirmed = a_get("ata") or a_get("arr_at") or None
+        arr_estimate = a_get("arr_et") or a_get("arr_wet") or None
 
         # choose best available arrival time at A for dwell calculations
         arr_time_for_dwell = actual_arr_confirmed or arr_estimate
         planned_arr_a_dt = (
-            combine_date_time_smart(ssd, planned_arr_a, base_dt=planned_dep_dt, tz=tz)
-            if (ssd and planned_arr_a and planned_dep_dt is not None)
+            combine(ssd_date, planned_arr_a, base_dt=planned_dep_dt, tz=tz)
+            if (planned_arr_a and planned_dep_dt is not None)
             else None
         )
         arr_dwell_dt = (
-            combine_date_time_smart(ssd, arr_time_for_dwell, base_dt=planned_dep_dt, tz=tz)
-            if (ssd and arr_time_for_dwell and planned_dep_dt is not None)
+            combine(ssd_date, arr_time_for_dwell, base_dt=planned_dep_dt, tz=tz)
+            if (arr_time_for_dwell and planned_dep_dt is not None)
             else None
         )
-        arrival_delay_min = diff_minutes_wrap(planned_arr_a_dt, arr_dwell_dt)
+        arrival_delay_min = diff(planned_arr_a_dt, arr_dwell_dt)
 
         # ---- dwell delay ----
         if a_code == first_station:
@@ -282,7 +313,7 @@ def extract_segments(
             else:
                 dwell_delay_min = None
 
-        out.append(
+        append(
             {
                 "rid": rid,
                 "ssd": ssd,
@@ -2,9 +2,11 @@
 from __future__ import annotations
 
 import logging
+import threading
 import time
 import stomp
-from typing import Any, Callable, Dict, List, Tuple
+from queue import Empty, Full, Queue
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from .decoder import decode_message
 
@@ -13,6 +15,8 @@ log = logging.getLogger(__name__)
 DecodedHandler = Callable[[List[Dict[str, Any]], List[Dict[str, Any]], bytes], None]
 #                               forecasts              schedules          xml_bytes
 
+_SENTINEL: Any = object()
+
 
 class DarwinListener(stomp.ConnectionListener):
     """
@@ -20,12 +24,37 @@ class DarwinListener(stomp.ConnectionListener):
       - decompresses frame.body
       - parses Forecast TS/Location + schedule OR/DT
       - calls on_decoded(forecasts, schedules, xml_bytes)
+
+    on_message only enqueues the raw body, so the STOMP receiver thread (which
+    also services heartbeats) never waits on decoding or the handler. Decoding and
+    on_decoded run in `num_workers` worker threads. The default of 1 keeps frames in
+    arrival order and the handler single-threaded; use more only if on_decoded is
+    thread-safe. When the queue is full, new frames are dropped (and counted) rather
+    than blocking the socket.
     """
 
-    def __init__(self, on_decoded: DecodedHandler, reconnect_delay_secs: int = 15):
+    def __init__(
+        self,
+        on_decoded: DecodedHandler,
+        reconnect_delay_secs: int = 15,
+        *,
+        queue_maxsize: int = 256,
+        num_workers: int = 1,
+    ):
         self._on_decoded = on_decoded
         self._reconnect_delay_secs = reconnect_delay_secs
 
+        self._q: "Queue[Any]" = Queue(maxsize=queue_maxsize)
+        self._closed = False
+        self.dropped = 0
+
+        self._workers = [
+            threading.Thread(target=self._worker_loop, name=f"darwin-decode-{i}", daemon=True)
+            for i in range(max(1, int(num_workers)))
+        ]
+        for t in self._workers:
+            t.start()
+
     def on_heartbeat(self):
         log.info("Received heartbeat")
 
@@ -43,8 +72,52 @@ class DarwinListener(stomp.ConnectionListener):
         log.info("Connecting to %s:%s", host_and_port[0], host_and_port[1])
 
     def on_message(self, frame):
+        if self._closed:
+            return
         try:
-            forecasts, schedules, xml_bytes = decode_message(frame.body)
-            self._on_decoded(forecasts, schedules, xml_bytes)
-        except Exception:
-            log.exception("Failed to decode Darwin message")
+            self._q.put_nowait(frame.body)
+        except Full:
+            self.dropped += 1
+            log.warning("Decode queue full, dropping Darwin frame (dropped=%d)", self.dropped)
+
+    def _worker_loop(self):
+        while True:
+            body = self._q.get()
+            try:
+                if body is _SENTINEL:
+                    return
+                forecasts, schedules, xml_bytes = decode_message(body)
+                self._on_decoded(forecasts, schedules, xml_bytes)
+            except Exception:
+                log.exception("Failed to decode Darwin message")
+            finally:
+                self._q.task_done()
+
+    def close(self, *, drain: bool = True, join_timeout: Optional[float] = 10.0):
+        """
+        Stop the worker threads.
+
+        drain=True  -> process frames already queued before stopping.
+        drain=False -> stop after the frames currently being handled.
+
+        join_timeout: seconds to wait for each worker. None means wait forever.
+        """
+        if self._closed:
+            return
+        self._closed = True
+
+        if not drain:
+            # discard queued frames (they still count as done for join())
+            while True:
+                try:
+                    self._q.get_nowait()
+                except Empty:
+                    break
+                self._q.task_done()
+
+        # one sentinel per worker, queued behind any remaining frames
+        for _ in self._workers:
+            self._q.put(_SENTINEL)
+
+        for t in self._workers:
+            t.join(timeout=join_timeout)
@@ -1,48 +1,66 @@
 # src/masphd/darwin/parse_forecasts.py
 from __future__ import annotations
 
-import xml.etree.ElementTree as ET
-from typing import Any, Dict, List, Union
+from sys import intern
+from typing import Any, Dict, List
+
+from .xml_utils import XmlInput, iter_elements
 
 NS_V16 = "http://www.thalesgroup.com/rtti/PushPort/v16"
 NS_FCST_V3 = "http://www.thalesgroup.com/rtti/PushPort/Forecasts/v3"
 
+# Clark-notation tags / paths, built once at import
+TS_TAG = f"{{{NS_V16}}}TS"
+_LOC_PATH = f".//{{{NS_FCST_V3}}}Location"
+
+
+def _intern_opt(v: Any) -> Any:
+    return intern(v) if v.__class__ is str else v
 
-def extract_attr(xml_data: Union[str, bytes]) -> List[Dict[str, Any]]:
+
+def extract_attr(xml_data: XmlInput) -> List[Dict[str, Any]]:
     """
     Extract TS/Location forecast data.
     Returns a list of dicts (one per Location).
     """
-    root = ET.fromstring(xml_data)
     out: List[Dict[str, Any]] = []
 
-    ts_path = f".//{{{NS_V16}}}TS"
-    loc_path = f".//{{{NS_FCST_V3}}}Location"
+    for ts_elem in iter_elements(xml_data, TS_TAG):
+        parse_ts_elem(ts_elem, out)
 
-    for ts_elem in root.iterfind(ts_path):
-        base = {
-            "updateOrigin": ts_elem.get("updateOrigin"),
-            "rid": ts_elem.get("rid"),
-            "uid": ts_elem.get("uid"),
-            "ssd": ts_elem.get("ssd"),
-        }
+    return out
 
-        for loc_elem in ts_elem.iterfind(loc_path):
-            item: Dict[str, Any] = dict(base)
 
-            # Location attributes (includes tpl, pta, ptd, wta, wtd, ata, atd, etc.)
-            item.update(loc_elem.attrib)
+def parse_ts_elem(ts_elem: Any, out: List[Dict[str, Any]]) -> None:
+    """
+    Append one dict per Location of a single TS element to `out`.
+    """
+    base = {
+        "updateOrigin": _intern_opt(ts_elem.get("updateOrigin")),
+        "rid": ts_elem.get("rid"),
+        "uid": ts_elem.get("uid"),
+        "ssd": _intern_opt(ts_elem.get("ssd")),
+    }
 
-            # Sub-elements (plat, length, and state sub-tags)
-            for sub_elem in loc_elem:
-                tag = sub_elem.tag.split("}")[-1]
-                if sub_elem.text is not None and sub_elem.text.strip() != "":
-                    item[tag] = sub_elem.text
-                else:
-                    item["state"] = tag
-                    for k, v in sub_elem.attrib.items():
-                        item[f"{tag}_{k}"] = v
+    for loc_elem in ts_elem.iterfind(_LOC_PATH):
+        # base + Location attributes (includes tpl, pta, ptd, wta, wtd, ata, atd, etc.) in one build
+        item: Dict[str, Any] = {**base, **loc_elem.attrib}
 
-            out.append(item)
+        # TIPLOCs repeat across every frame; interned values share one object and
+        # compare by identity against the (interned) STATION_PAIRS literals.
+        tpl = item.get("tpl")
+        if tpl:
+            item["tpl"] = intern(tpl)
 
-    return out
+        # Sub-elements (plat, length, and state sub-tags)
+        for sub_elem in loc_elem:
+            tag = intern(sub_elem.tag.rpartition("}")[2])
+            text = sub_elem.text
+            if text is not None and text.strip() != "":
+                item[tag] = text
+            else:
+                item["state"] = tag
+                for k, v in sub_elem.attrib.items():
+                    item[intern(f"{tag}_{k}")] = v
+
+        out.append(item)
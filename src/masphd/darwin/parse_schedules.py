@@ -2,52 +2,65 @@
 from __future__ import annotations
 
 import xml.etree.ElementTree as ET
-from typing import Any, Dict, List, Union
+from sys import intern
+from typing import Any, Dict, List
+
+from .xml_utils import XmlInput, iter_elements
 
 NS_V16 = "http://www.thalesgroup.com/rtti/PushPort/v16"
 NS_SCHED_V3 = "http://www.thalesgroup.com/rtti/PushPort/Schedules/v3"
 
+# Clark-notation tags / paths, built once at import
+SCHEDULE_TAG = f"{{{NS_V16}}}schedule"
+_OR_PATH = f".//{{{NS_SCHED_V3}}}OR"
+_DT_PATH = f".//{{{NS_SCHED_V3}}}DT"
+
 
-def extract_schedule(xml_data: Union[str, bytes]) -> List[Dict[str, Any]]:
+def extract_schedule(xml_data: XmlInput) -> List[Dict[str, Any]]:
     """
     Extract schedule OR/DT location entries.
     Returns a list of dicts (one per OR or DT).
     """
-    root = ET.fromstring(xml_data)
     out: List[Dict[str, Any]] = []
 
-    sched_path = f".//{{{NS_V16}}}schedule"
-    or_path = f".//{{{NS_SCHED_V3}}}OR"
-    dt_path = f".//{{{NS_SCHED_V3}}}DT"
+    for sched_elem in iter_elements(xml_data, SCHEDULE_TAG):
+        parse_schedule_elem(sched_elem, out)
+
+    return out
 
-    for sched_elem in root.iterfind(sched_path):
-        base = {
-            "rid": sched_elem.get("rid"),
-            "uid": sched_elem.get("uid"),
-            "ssd": sched_elem.get("ssd"),
-        }
 
-        for loc_elem in sched_elem.iterfind(or_path):
-            out.append(_parse_sched_location(base, loc_elem, "OR"))
+def parse_schedule_elem(sched_elem: ET.Element, out: List[Dict[str, Any]]) -> None:
+    """
+    Append the OR and DT entries of a single schedule element to `out`.
+    """
+    base = {
+        "rid": sched_elem.get("rid"),
+        "uid": sched_elem.get("uid"),
+        "ssd": sched_elem.get("ssd"),
+    }
 
-        for loc_elem in sched_elem.iterfind(dt_path):
-            out.append(_parse_sched_location(base, loc_elem, "DT"))
+    for loc_elem in sched_elem.iterfind(_OR_PATH):
+        out.append(_parse_sched_location(base, loc_elem, "OR"))
 
-    return out
+    for loc_elem in sched_elem.iterfind(_DT_PATH):
+        out.append(_parse_sched_location(base, loc_elem, "DT"))
 
 
 def _parse_sched_location(base: Dict[str, Any], loc_elem: ET.Element, loc_type: str) -> Dict[str, Any]:
-    item: Dict[str, Any] = dict(base)
-    item.update(loc_elem.attrib)
-    item["type"] = loc_type
+    item: Dict[str, Any] = {**base, **loc_elem.attrib, "type": loc_type}
+
+    tpl = item.get("tpl")
+    if tpl:
+        item["tpl"] = intern(tpl)
 
     for sub_elem in loc_elem:
-        tag = sub_elem.tag.split("}")[-1]
-        if sub_elem.text is not None and sub_elem.text.strip() != "":
-            item[tag] = sub_elem.text
+        tag = intern(sub_elem.tag.rpartition("}")[2])
+        text = sub_elem.text
+        if text is not None and text.strip() != "":
+            item[tag] = text
         else:
             item["state"] = tag
             for k, v in sub_elem.attrib.items():
-                item[f"{tag}_{k}"] = v
+                item[intern(f"{tag}_{k}")] = v
 
     return item
@@ -1,8 +1,9 @@
 # src/masphd/darwin/realtime_filter.py
 from __future__ import annotations
 
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from .time_utils import combine_date_time_smart
 
@@ -44,6 +45,86 @@ def _planned_arr_dt(seg: Dict[str, Any], tz=None) -> Optional[datetime]:
     return combine_date_time_smart(ssd, t, base_dt=base, tz=tz)
 
 
+def _segment_times(seg: Dict[str, Any], tz=None) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    (planned dep at first station, planned arr at second station), both made aware with tz.
+    Uses the values stored by precompute_times when present.
+    """
+    if "_pdep_dt" in seg:
+        return seg["_pdep_dt"], seg["_parr2_dt"]
+
+    # combine_date_time_smart(tz=tz) already returns tz-aware values when tz is given
+    # (and the arrival inherits the departure's tzinfo), so no _to_aware pass is needed.
+    dep_dt = _planned_dep_dt(seg, tz=tz)
+    if dep_dt is None:
+        return None, None
+
+    # Save base for arrival rollover handling
+    seg["_planned_dep_dt_for_filter"] = dep_dt
+    arr_dt = _planned_arr_dt(seg, tz=tz)
+    seg.pop("_planned_dep_dt_for_filter", None)
+
+    return dep_dt, arr_dt
+
+
+def precompute_times(segments: List[Dict[str, Any]], *, tz=None) -> None:
+    """
+    Compute each segment's planned times once and store them on the segment as
+    seg["_pdep_dt"] / seg["_parr2_dt"] (None when unknown).
+
+    filter_segments_by_now and SegmentTimeIndex reuse them instead of re-parsing
+    ssd + times on every call. Use the same tz for precompute and filtering, and
+    re-run this if planned_dep / planned_arr_second change.
+    """
+    for seg in segments:
+        seg.pop("_pdep_dt", None)
+        dep_dt, arr_dt = _segment_times(seg, tz=tz)
+        seg["_pdep_dt"] = dep_dt
+        seg["_parr2_dt"] = arr_dt
+
+
+class SegmentTimeIndex:
+    """
+    Segments sorted by planned departure, for repeated time-window queries over the
+    same segment list: each query is a bisect (O(log N + k)) instead of a full scan.
+
+    Segments without a planned departure are left out. Results come back in planned
+    departure order (filter_segments_by_now keeps input order instead).
+    """
+
+    def __init__(self, segments: List[Dict[str, Any]], *, tz=None):
+        self._tz = tz
+        precompute_times(segments, tz=tz)
+        timed = [seg for seg in segments if seg["_pdep_dt"] is not None]
+        timed.sort(key=lambda seg: seg["_pdep_dt"])
+        self._segments = timed
+        self._dep_times = [seg["_pdep_dt"] for seg in timed]
+
+    def __len__(self) -> int:
+        return len(self._segments)
+
+    def near_departure(self, now: datetime, *, before_mins: int = 30, after_mins: int = 180) -> List[Dict[str, Any]]:
+        now = _to_aware(now, self._tz)
+        lo = bisect_left(self._dep_times, now - timedelta(minutes=before_mins))
+        hi = bisect_right(self._dep_times, now + timedelta(minutes=after_mins))
+        return self._segments[lo:hi]
+
+    def in_progress(
+        self,
+        now: datetime,
+        *,
+        dep_grace_after_now_mins: int = 5,
+        arr_grace_before_now_mins: int = 2,
+    ) -> List[Dict[str, Any]]:
+        now = _to_aware(now, self._tz)
+        hi = bisect_right(self._dep_times, now + timedelta(minutes=dep_grace_after_now_mins))
+        arr_limit = now - timedelta(minutes=arr_grace_before_now_mins)
+        return [
+            seg for seg in self._segments[:hi]
+            if seg["_parr2_dt"] is not None and seg["_parr2_dt"] >= arr_limit
+        ]
+
+
 def filter_segments_by_now(
     segments: List[Dict[str, Any]],
     *,
@@ -80,6 +161,7 @@ def filter_segments_by_now(
       - This filter uses PLANNED times only (by design).
       - For "in_progress", we need planned arrival at the destination station of the segment.
         That must be stored as seg["planned_arr_second"] by the extractor/notebook.
+      - Times stored by precompute_times (same tz) are reused when present.
     """
     now = _to_aware(now, tz)
 
@@ -93,10 +175,9 @@ def filter_segments_by_now(
         win_end = now + timedelta(minutes=after_mins)
 
         for seg in segments:
-            dep_dt = _planned_dep_dt(seg, tz=tz)
+            dep_dt = seg["_pdep_dt"] if "_pdep_dt" in seg else _planned_dep_dt(seg, tz=tz)
             if dep_dt is None:
                 continue
-            dep_dt = _to_aware(dep_dt, tz)
 
             if win_start <= dep_dt <= win_end:
                 out.append(seg)
@@ -108,23 +189,14 @@ def filter_segments_by_now(
     arr_limit = now - timedelta(minutes=arr_grace_before_now_mins)
 
     for seg in segments:
-        dep_dt = _planned_dep_dt(seg, tz=tz)
+        dep_dt, arr_dt = _segment_times(seg, tz=tz)
         if dep_dt is None:
             continue
-        dep_dt = _to_aware(dep_dt, tz)
 
-        # Save base for arrival rollover handling
-        seg["_planned_dep_dt_for_filter"] = dep_dt
-
-        arr_dt = _planned_arr_dt(seg, tz=tz)
         if arr_dt is None:
             # If we don't know planned arrival at destination, we cannot confidently say "in progress"
             # so skip it.
-            seg.pop("_planned_dep_dt_for_filter", None)
             continue
-        arr_dt = _to_aware(arr_dt, tz)
-
-        seg.pop("_planned_dep_dt_for_filter", None)
 
         # in-progress condition with grace
         if dep_dt <= dep_limit and arr_dt >= arr_limit:
@@ -10,13 +10,10 @@ Important:
 from __future__ import annotations
 
 from functools import lru_cache
-from typing import Final, Iterable, List, Set, Tuple, Dict, Optional
+from types import MappingProxyType
+from typing import Final, Iterable, List, Mapping, Set, Tuple, Dict, Optional
 
-from masphd.utils.station_lookup import (
-    get_crs_by_tiploc2,
-    get_name_by_tiploc2,
-    get_tiploc_by_tiploc2,
-)
+from masphd.utils.station_lookup import get_values_batch
 
 # -----------------------------
 # Ordered pairs (do not reverse)
@@ -79,6 +76,12 @@ def iter_route_tiploc2s() -> Iterable[str]:
 
 
 TIPLOC2_ROUTE: Final[List[str]] = list(iter_route_tiploc2s())
+TIPLOC2_ROUTE_TUP: Final[Tuple[str, ...]] = tuple(TIPLOC2_ROUTE)
+
+# TIPLOC2 -> position in TIPLOC2_ROUTE; pair i is (TIPLOC2_ROUTE[i], TIPLOC2_ROUTE[i + 1])
+TIPLOC2_INDEX: Final[Mapping[str, int]] = MappingProxyType(
+    {t2: i for i, t2 in enumerate(TIPLOC2_ROUTE_TUP)}
+)
 
 
 # -----------------------------
@@ -87,30 +90,30 @@ TIPLOC2_ROUTE: Final[List[str]] = list(iter_route_tiploc2s())
 @lru_cache(maxsize=1)
 def route_crss() -> List[Optional[str]]:
     """TIPLOC2 -> CRS for the route (cached)."""
-    return [get_crs_by_tiploc2(t2) for t2 in TIPLOC2_ROUTE]
+    return get_values_batch("TIPLOC2", TIPLOC2_ROUTE, "CRS")
 
 
 @lru_cache(maxsize=1)
 def route_names() -> List[Optional[str]]:
     """TIPLOC2 -> NAME for the route (cached)."""
-    return [get_name_by_tiploc2(t2) for t2 in TIPLOC2_ROUTE]
+    return get_values_batch("TIPLOC2", TIPLOC2_ROUTE, "NAME")
 
 
 @lru_cache(maxsize=1)
 def route_tiplocs() -> List[Optional[str]]:
     """TIPLOC2 -> TIPLOC (your CSV TIPLOC column) for the route (cached)."""
-    return [get_tiploc_by_tiploc2(t2) for t2 in TIPLOC2_ROUTE]
+    return get_values_batch("TIPLOC2", TIPLOC2_ROUTE, "TIPLOC")
 
 
 @lru_cache(maxsize=1)
 def route_maps() -> tuple[
-    Dict[str, Optional[str]],  # tiploc2 -> crs
-    Dict[str, Optional[str]],  # tiploc2 -> name
-    Dict[str, Optional[str]],  # tiploc2 -> tiploc
-    Dict[str, str],            # crs -> tiploc2 (route-canonical)
+    Mapping[str, Optional[str]],  # tiploc2 -> crs
+    Mapping[str, Optional[str]],  # tiploc2 -> name
+    Mapping[str, Optional[str]],  # tiploc2 -> tiploc
+    Mapping[str, str],            # crs -> tiploc2 (route-canonical)
 ]:
     """
-    Returns cached dicts (route-scoped):
+    Returns cached read-only mappings (route-scoped):
 
       - tiploc2 -> crs
       - tiploc2 -> name
@@ -119,6 +122,9 @@ def route_maps() -> tuple[
 
     If a CRS appears multiple times on this route, the FIRST occurrence
     in journey order is kept.
+
+    The mappings are MappingProxyType views: the result is shared through
+    lru_cache, so callers must not be able to mutate it in place.
     """
     crss = route_crss()
     names = route_names()
@@ -137,7 +143,12 @@ def route_maps() -> tuple[
         if crs and crs not in crs_to_tiploc2:
             crs_to_tiploc2[crs] = t2
 
-    return tiploc2_to_crs, tiploc2_to_name, tiploc2_to_tiploc, crs_to_tiploc2
+    return (
+        MappingProxyType(tiploc2_to_crs),
+        MappingProxyType(tiploc2_to_name),
+        MappingProxyType(tiploc2_to_tiploc),
+        MappingProxyType(crs_to_tiploc2),
+    )
 
 
 # -----------------------------
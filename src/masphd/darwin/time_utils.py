@@ -1,8 +1,34 @@
 # src/masphd/darwin/time_utils.py
 from __future__ import annotations
 
-from datetime import datetime, time, timedelta
-from typing import Optional
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Any, Optional
+
+_NOT_CANONICAL = object()
+
+
+def _canonical_hms(value: str) -> Any:
+    """
+    Fixed-offset reader for canonical "HH:MM" / "HH:MM:SS" strings (single int(),
+    no strip/split). Returns (h, m, s), None if canonical but out of range, or
+    _NOT_CANONICAL for any other shape (caller uses the general parser).
+    """
+    n = len(value)
+    if (n == 5 or (n == 8 and value[5] == ":")) and value[2] == ":" and value.isascii():
+        digits = value[0:2] + value[3:5] + value[6:8]
+        if digits.isdigit():
+            v = int(digits)
+            if n == 8:
+                h, rest = divmod(v, 10000)
+                m, sec = divmod(rest, 100)
+            else:
+                h, m = divmod(v, 100)
+                sec = 0
+            if h < 24 and m < 60 and sec < 60:
+                return h, m, sec
+            return None
+    return _NOT_CANONICAL
 
 
 def parse_hms(value: Optional[str]) -> Optional[time]:
@@ -15,6 +41,20 @@ def parse_hms(value: Optional[str]) -> Optional[time]:
     if not value:
         return None
 
+    # Fast path for canonical str values: validated up front, so it never raises.
+    if value.__class__ is str:
+        hms = _canonical_hms(value)
+        if hms is not _NOT_CANONICAL:
+            return time(*hms) if hms is not None else None
+
+    return _parse_hms_general(value)
+
+
+def _parse_hms_general(value: Any) -> Optional[time]:
+    """
+    Lenient parser for anything that is not canonical "HH:MM[:SS]" (padding,
+    one-digit fields, non-str input). Out-of-range / malformed -> None.
+    """
     s = str(value).strip()
     if not s:
         return None
@@ -33,6 +73,48 @@ def parse_hms(value: Optional[str]) -> Optional[time]:
     return None
 
 
+def seconds_of_day(value: Optional[str]) -> Optional[int]:
+    """
+    Darwin time string -> seconds since midnight, or None.
+    Accepts exactly what parse_hms accepts, without building a time object.
+    """
+    if not value:
+        return None
+
+    if value.__class__ is str:
+        hms = _canonical_hms(value)
+        if hms is not _NOT_CANONICAL:
+            return hms[0] * 3600 + hms[1] * 60 + hms[2] if hms is not None else None
+
+    t = _parse_hms_general(value)
+    if t is None:
+        return None
+    return t.hour * 3600 + t.minute * 60 + t.second
+
+
+@lru_cache(maxsize=64)
+def parse_ssd_date(ssd: str) -> Optional[date]:
+    """
+    Parse a service start date (YYYY-MM-DD) into datetime.date, or None if invalid.
+    The canonical 10-char form is sliced directly; anything else goes through strptime.
+
+    Cached: a feed window only ever carries a handful of distinct ssd values,
+    so repeated calls are a single dict lookup returning the same date object.
+    """
+    if len(ssd) == 10 and ssd[4] == "-" and ssd[7] == "-":
+        y, m, d = ssd[0:4], ssd[5:7], ssd[8:10]
+        if y.isdigit() and m.isdigit() and d.isdigit():
+            try:
+                return date(int(y), int(m), int(d))
+            except ValueError:
+                return None
+
+    try:
+        return datetime.strptime(ssd, "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
 def combine_date_time(ssd: str, t: Optional[str], tz=None) -> Optional[datetime]:
     """
     Combine service start date (YYYY-MM-DD) and a Darwin time string into datetime.
@@ -42,9 +124,8 @@ def combine_date_time(ssd: str, t: Optional[str], tz=None) -> Optional[datetime]
     if tt is None:
         return None
 
-    try:
-        d = datetime.strptime(ssd, "%Y-%m-%d").date()
-    except ValueError:
+    d = parse_ssd_date(ssd)
+    if d is None:
         return None
 
     dt = datetime.combine(d, tt)
@@ -72,6 +153,37 @@ def combine_date_time_smart(
     if dt is None:
         return None
 
+    return _roll_over(dt, base_dt, rollover_threshold_hours)
+
+
+def combine_date_time_fast(
+    ssd_date: date,
+    t: Optional[str],
+    *,
+    base_dt: Optional[datetime] = None,
+    tz=None,
+    rollover_threshold_hours: float = 2.0,
+) -> Optional[datetime]:
+    """
+    Same as combine_date_time_smart, but takes an already-parsed date
+    (see parse_ssd_date) so callers combining many times for one service
+    parse ssd only once.
+    """
+    tt = parse_hms(t)
+    if tt is None:
+        return None
+
+    dt = datetime.combine(ssd_date, tt)
+    if tz is not None:
+        dt = dt.replace(tzinfo=tz)
+
+    return _roll_over(dt, base_dt, rollover_threshold_hours)
+
+
+_ONE_DAY = timedelta(days=1)
+
+
+def _roll_over(dt: datetime, base_dt: Optional[datetime], rollover_threshold_hours: float) -> datetime:
     if base_dt is None:
         return dt
 
@@ -84,7 +196,7 @@ def combine_date_time_smart(
     if dt < base_dt:
         gap = base_dt - dt
         if gap > timedelta(hours=rollover_threshold_hours):
-            dt = dt + timedelta(days=1)
+            dt = dt + _ONE_DAY
 
     return dt
 
@@ -121,17 +233,21 @@ def diff_minutes_wrap(planned: Optional[datetime], actual: Optional[datetime]) -
     if planned is None or actual is None:
         return None
 
-    # Ensure awareness matches
-    if (planned.tzinfo is not None) and (actual.tzinfo is None):
-        actual = actual.replace(tzinfo=planned.tzinfo)
-    if (planned.tzinfo is None) and (actual.tzinfo is not None):
-        actual = actual.replace(tzinfo=None)
+    # Ensure awareness matches (common case: both share the same tzinfo, nothing to do)
+    p_tz = planned.tzinfo
+    a_tz = actual.tzinfo
+    if p_tz is not a_tz:
+        if (p_tz is not None) and (a_tz is None):
+            actual = actual.replace(tzinfo=p_tz)
+        elif (p_tz is None) and (a_tz is not None):
+            actual = actual.replace(tzinfo=None)
 
     minutes = (actual - planned).total_seconds() / 60.0
 
+    # at most one fold applies (after -1440 the value is > -240)
     if minutes > 1200:
         minutes -= 1440
-    if minutes < -1200:
+    elif minutes < -1200:
         minutes += 1440
 
     return minutes
@@ -0,0 +1,66 @@
+# src/masphd/darwin/xml_utils.py
+from __future__ import annotations
+
+import xml.etree.ElementTree as ET
+from io import BytesIO
+from typing import IO, Any, Iterator, Tuple, Union
+
+# Optional dependency (recommended for the realtime feed):
+#   pip install lxml
+# lxml runs the parse loop in C (libxml2); stdlib ElementTree is the fallback.
+try:
+    from lxml import etree as _lxml_etree
+except Exception:
+    _lxml_etree = None
+
+# raw XML text/bytes, or a binary file-like object the parser reads on demand
+XmlInput = Union[str, bytes, IO[bytes]]
+
+
+def iter_elements(xml_data: XmlInput, tag: Union[str, Tuple[str, ...]]) -> Iterator[Any]:
+    """
+    Yield every element named `tag` (Clark notation, "{ns}local") in document order.
+    `tag` may also be a tuple of names, so one pass can pick up several element types.
+
+    With lxml this streams via iterparse: each yielded element is complete, and it
+    is cleared (together with already-processed siblings) once the caller moves on,
+    so memory stays bounded. Read what you need before advancing the iterator.
+
+    Without lxml it falls back to ET.fromstring / ET.parse + iterfind / iter.
+
+    A file-like `xml_data` (anything with .read) is parsed straight from the
+    stream, e.g. a decompressing reader, so the full document never has to exist
+    as one bytes object.
+    """
+    is_stream = hasattr(xml_data, "read")
+
+    if _lxml_etree is None:
+        root = ET.parse(xml_data).getroot() if is_stream else ET.fromstring(xml_data)
+        if isinstance(tag, str):
+            yield from root.iterfind(f".//{tag}")
+        else:
+            tags = frozenset(tag)
+            for elem in root.iter():
+                if elem is not root and elem.tag in tags:
+                    yield elem
+        return
+
+    if is_stream:
+        source = xml_data
+    else:
+        if isinstance(xml_data, str):
+            xml_data = xml_data.encode("utf-8")
+        source = BytesIO(xml_data)  # shares the bytes buffer, no copy
+
+    # comments / PIs dropped, as ElementTree does, so every child has a str tag
+    events = _lxml_etree.iterparse(
+        source, events=("end",), tag=tag, remove_comments=True, remove_pis=True
+    )
+    for _, elem in events:
+        yield elem
+
+        elem.clear(keep_tail=True)
+        parent = elem.getparent()
+        if parent is not None:
+            while elem.getprevious() is not None:
+                del parent[0]
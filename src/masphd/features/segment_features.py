@@ -2,10 +2,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from operator import itemgetter
+from typing import Any, Dict, List, Optional, Sequence
 
-from masphd.darwin.time_utils import combine_date_time_smart
-from .time_features import TimeFeatureExtractor
+import numpy as np
+import pandas as pd
+
+from masphd.darwin.time_utils import combine_date_time_smart, parse_ssd_date, seconds_of_day
+from .time_features import SEASONS, TimeFeatureExtractor
 
 
 FEATURE_ORDER = [
@@ -21,6 +25,17 @@ FEATURE_ORDER = [
     "holiday",
 ]
 
+_FEATURE_GETTER = itemgetter(*FEATURE_ORDER)
+
+# Lookup tables for build_batch (index with Monday=0 dayofweek / searchsorted bucket)
+_DAY_NAMES = np.array(
+    ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"],
+    dtype=object,
+)
+# SEASONS as inclusive month*100+day upper bounds -> season name
+_SEASON_EDGES = np.array([end.month * 100 + end.day for _, (_, end) in SEASONS[:-1]])
+_SEASON_NAMES = np.array([name for name, _ in SEASONS], dtype=object)
+
 
 @dataclass
 class SegmentFeatures:
@@ -88,24 +103,104 @@ class SegmentFeatureBuilder:
         if dwell_delay is None:
             dwell_delay = 0.0
 
-        feat = SegmentFeatures(
-            departure_delay=float(dep_delay),
-            dwell_delay=float(dwell_delay),
-            peak=int(tf.peak),
-            day_of_week=str(tf.day_of_week),
-            day_of_month=int(tf.day_of_month),
-            hour_of_day=int(tf.hour_of_day),
-            weekend=int(tf.weekend),
-            season=str(tf.season),
-            month=int(tf.month),
-            holiday=int(tf.holiday),
-        )
+        # plain dict in FEATURE_ORDER (same content as SegmentFeatures.as_dict(),
+        # without building the intermediate dataclass)
+        return {
+            "departure_delay": float(dep_delay),
+            "dwell_delay": float(dwell_delay),
+            "peak": tf.peak,
+            "day_of_week": tf.day_of_week,
+            "day_of_month": tf.day_of_month,
+            "hour_of_day": tf.hour_of_day,
+            "weekend": tf.weekend,
+            "season": tf.season,
+            "month": tf.month,
+            "holiday": tf.holiday,
+        }
+
+    def build_batch(self, segments: Sequence[Dict[str, Any]]) -> pd.DataFrame:
+        """
+        Vectorised build() for many segments at once.
 
-        return feat.as_dict()
+        Returns one row per segment that build() would accept (same skip rules),
+        columns in FEATURE_ORDER, indexed by the segment's position in `segments`
+        so predictions can be mapped back. Calendar features come from one
+        DatetimeIndex instead of one extract() per segment.
+        """
+        pos: List[int] = []
+        dates = []
+        secs: List[int] = []
+        dep_delays: List[float] = []
+        dwell_delays: List[float] = []
+
+        for i, segment in enumerate(segments):
+            ssd = segment.get("ssd")
+            planned_dep = segment.get("planned_dep")
+            if not ssd or not planned_dep:
+                continue
+
+            dep_delay = segment.get("departure_delay_min")
+            if dep_delay is None:
+                continue
+
+            # same anchor validation as combine_date_time_smart in build()
+            d = parse_ssd_date(ssd)
+            sec = seconds_of_day(planned_dep)
+            if d is None or sec is None:
+                continue
+
+            dwell_delay = segment.get("dwell_delay_min")
+
+            pos.append(i)
+            dates.append(d)
+            secs.append(sec)
+            dep_delays.append(float(dep_delay))
+            dwell_delays.append(0.0 if dwell_delay is None else float(dwell_delay))
+
+        if not pos:
+            return pd.DataFrame(columns=FEATURE_ORDER)
+
+        # wall-clock anchor (ssd + planned_dep); tz does not change calendar fields
+        ts = pd.to_datetime(dates) + pd.to_timedelta(secs, unit="s")
+
+        dow = ts.dayofweek.to_numpy()
+        hour = ts.hour.to_numpy()
+        day = ts.day.to_numpy()
+        month = ts.month.to_numpy()
+
+        weekend = dow >= 5
+        peak = ~weekend & (((hour > 6) & (hour < 10)) | ((hour >= 16) & (hour <= 19)))
+        season = _SEASON_NAMES[np.searchsorted(_SEASON_EDGES, month * 100 + day, side="left")]
+
+        # holiday lookups once per distinct date, then a vectorised isin
+        days = ts.normalize()
+        holiday_days = [d for d in days.unique() if self._time_extractor.is_holiday(d.date())]
+        holiday = days.isin(holiday_days)
+
+        return pd.DataFrame(
+            {
+                "departure_delay": dep_delays,
+                "dwell_delay": dwell_delays,
+                "peak": peak.astype(np.int64),
+                "day_of_week": _DAY_NAMES[dow],
+                "day_of_month": day.astype(np.int64),
+                "hour_of_day": hour.astype(np.int64),
+                "weekend": weekend.astype(np.int64),
+                "season": season,
+                "month": month.astype(np.int64),
+                "holiday": holiday.astype(np.int64),
+            },
+            index=pos,
+            columns=FEATURE_ORDER,
+        )
 
     @staticmethod
     def order_features(feat_dict: Dict[str, Any]) -> Dict[str, Any]:
         """
         Returns a dict in FEATURE_ORDER. Useful for consistent debug/printing.
         """
-        return {k: feat_dict.get(k) for k in FEATURE_ORDER}
+        try:
+            return dict(zip(FEATURE_ORDER, _FEATURE_GETTER(feat_dict)))
+        except KeyError:
+            # missing keys map to None
+            return {k: feat_dict.get(k) for k in FEATURE_ORDER}
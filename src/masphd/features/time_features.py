@@ -3,7 +3,8 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import date, datetime
-from typing import Optional, Union
+from functools import lru_cache
+from typing import Optional, Tuple, Union
 
 # Optional dependency (recommended):
 #   pip install holidays
@@ -23,15 +24,30 @@ SEASONS = [
 ]
 
 
-def _get_season(d: date) -> str:
-    d2 = d.replace(year=Y)
+DAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+# day offset of each month in the dummy leap year (index 1..12)
+_MONTH_OFFSET = (0, 0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335)
+
+
+def _build_season_table() -> Tuple[str, ...]:
+    # one entry per (month, day) of year Y, filled by walking SEASONS once
+    table = ["Winter"] * 366
     for season, (start, end) in SEASONS:
-        if start <= d2 <= end:
-            return season
-    return "Winter"
+        first = start.timetuple().tm_yday - 1
+        last = end.timetuple().tm_yday - 1
+        table[first:last + 1] = [season] * (last - first + 1)
+    return tuple(table)
 
 
-@dataclass(frozen=True)
+_SEASON_BY_DOY = _build_season_table()
+
+
+def _get_season(d: date) -> str:
+    return _SEASON_BY_DOY[_MONTH_OFFSET[d.month] + d.day - 1]
+
+
+@dataclass(frozen=True, slots=True)
 class TimeFeatures:
     peak: int
     day_of_week: str
@@ -57,21 +73,52 @@ class TimeFeatureExtractor:
         self._holiday_region = holiday_region
         self._holiday_subregion = holiday_subregion
 
+        # years materialised up front; others still fall back to the calendar
+        this_year = date.today().year
+        self._holiday_years = frozenset(range(this_year - 1, this_year + 3))
+
         if _holidays is not None:
             try:
                 # For UK: holidays.country_holidays("GB", subdiv="ENG") etc.
                 self._holiday_calendar = _holidays.country_holidays(
                     holiday_region,
                     subdiv=holiday_subregion,
+                    years=sorted(self._holiday_years),
                 )
             except Exception:
                 self._holiday_calendar = None
         else:
             self._holiday_calendar = None
 
+        if self._holiday_calendar is not None:
+            self._holiday_set = frozenset(
+                d for d in self._holiday_calendar.keys() if d.year in self._holiday_years
+            )
+        else:
+            self._holiday_set = frozenset()
+
+        # peak flag per hour, one table per weekend value (peak_flag evaluated once)
+        self._peak_by_hour = tuple(tuple(self.peak_flag(h, w) for h in range(24)) for w in (0, 1))
+
+        # per-instance so the cache does not outlive (or leak) the extractor
+        self._per_date = lru_cache(maxsize=2048)(self._date_fields)
+
+    def _date_fields(self, d: date) -> Tuple[str, int, str, int, Tuple[int, ...]]:
+        """
+        Date-only features (day_of_week, weekend, season, holiday, peak-by-hour
+        table); cached per date because a live feed keeps asking about the same
+        one or two days.
+        """
+        day_of_week = DAY_NAMES[d.weekday()]
+        weekend = 1 if d.weekday() >= 5 else 0
+        return day_of_week, weekend, _get_season(d), self.is_holiday(d), self._peak_by_hour[weekend]
+
     def is_holiday(self, d: date) -> int:
         if self._holiday_calendar is None:
             return 0
+        # plain frozenset hash lookup for the common (recent) years
+        if type(d) is date and d.year in self._holiday_years:
+            return 1 if d in self._holiday_set else 0
         return 1 if d in self._holiday_calendar else 0
 
     @staticmethod
@@ -92,24 +139,20 @@ class TimeFeatureExtractor:
     def extract(self, dt: Union[datetime, date]) -> TimeFeatures:
         if isinstance(dt, datetime):
             d = dt.date()
-            hour = int(dt.hour)
+            hour = dt.hour
         else:
             d = dt
             hour = 0
 
-        day_of_week = d.strftime("%A")
-        weekend = self.weekend_flag(day_of_week)
-        peak = self.peak_flag(hour, weekend)
-        season = _get_season(d)
-        holiday = self.is_holiday(d)
+        day_of_week, weekend, season, holiday, peak_by_hour = self._per_date(d)
 
         return TimeFeatures(
-            peak=peak,
+            peak=peak_by_hour[hour],
             day_of_week=day_of_week,
-            day_of_month=int(d.day),
-            hour_of_day=int(hour),
+            day_of_month=d.day,
+            hour_of_day=hour,
             weekend=weekend,
             season=season,
-            month=int(d.month),
-            holiday=int(holiday),
+            month=d.month,
+            holiday=holiday,
         )
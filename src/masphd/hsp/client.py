@@ -1,8 +1,21 @@
 # src/masphd/hsp/client.py
+import json
 import logging
-from typing import Any, Dict, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Optional dependency (recommended, in the "fast" extra):
+#   pip install orjson
+try:
+    import orjson as _orjson
+except Exception:
+    _orjson = None
 
 from masphd.config import (
     HSP_SERVICE_DETAILS_URL,
@@ -13,10 +26,46 @@ from masphd.config import (
 log = logging.getLogger(__name__)
 
 
+class _RateLimiter:
+    """
+    Thread-safe token bucket: allows `rate_per_sec` calls per second on average,
+    with bursts of up to `burst` calls.
+    """
+
+    def __init__(self, rate_per_sec: float, burst: int = 1):
+        self._rate = float(rate_per_sec)
+        self._capacity = float(max(1, burst))
+        self._tokens = self._capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                refill = (now - self._last) * self._rate
+                self._tokens = min(self._capacity, self._tokens + refill)
+                self._last = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self._rate
+            time.sleep(wait)
+
+
 class HSPClient:
     """
     HTTP client for HSP service-details endpoint.
     Mirrors the style of masphd.darwin.DarwinClient, but uses requests + POST.
+
+    The session keeps a pool of up to `pool_size` keep-alive connections, so one
+    client can be shared by several worker threads. `max_requests_per_sec`
+    (0 = unlimited) throttles all threads together. Connection errors and
+    429/5xx responses are retried up to `max_retries` times with exponential
+    backoff (honouring Retry-After); the service-details POST is a read-only query.
+
+    For many RIDs use iter_service_details_raw / get_service_details_raw_many,
+    which keep up to `pool_size` requests in flight over the pooled connections.
     """
 
     def __init__(
@@ -24,11 +73,37 @@ class HSPClient:
         timeout_secs: float = 20.0,
         session: Optional[requests.Session] = None,
         user_agent: str = "masphd-hsp-client/1.0",
+        *,
+        pool_size: int = 16,
+        max_requests_per_sec: float = 0.0,
+        max_retries: int = 3,
     ):
         self._timeout_secs = timeout_secs
+        self._pool_size = max(1, pool_size)
         self._session = session or requests.Session()
         self._session.headers.update({"User-Agent": user_agent})
 
+        if session is None:
+            retry = Retry(
+                total=max_retries,
+                backoff_factor=0.3,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=Retry.DEFAULT_ALLOWED_METHODS | {"POST"},
+                # hand the last response back so the non-200 path logs its status
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(
+                pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+            )
+            self._session.mount("https://", adapter)
+            self._session.mount("http://", adapter)
+
+        # burst=1: the first second must not exceed the cap either (a pool_size burst
+        # would let every worker fire at once, e.g. 16 requests at --max-rps 5)
+        self._limiter = None
+        if max_requests_per_sec > 0:
+            self._limiter = _RateLimiter(max_requests_per_sec, burst=1)
+
     def get_service_details_raw(self, rid: str) -> Optional[Dict[str, Any]]:
         """
         Fetch raw JSON response for a service by RID.
@@ -36,6 +111,9 @@ class HSPClient:
         """
         payload = {"rid": rid}
 
+        if self._limiter is not None:
+            self._limiter.acquire()
+
         try:
             resp = self._session.post(
                 HSP_SERVICE_DETAILS_URL,
@@ -57,7 +135,48 @@ class HSPClient:
             return None
 
         try:
-            return resp.json()
+            if _orjson is not None:
+                # parses the raw bytes directly (no intermediate str decode)
+                return _orjson.loads(resp.content)
+            # stdlib fallback also takes bytes (UTF-8/16/32 detected from the BOM /
+            # leading bytes), skipping requests' text decode + charset guess
+            return json.loads(resp.content)
         except ValueError:
             log.warning("HSP invalid JSON for rid=%s", rid)
             return None
+
+    def iter_service_details_raw(
+        self,
+        rids: Iterable[str],
+        *,
+        max_workers: Optional[int] = None,
+    ) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]:
+        """
+        Fetch several RIDs concurrently.
+        Yields (rid, raw_or_None) in completion order, so callers can process
+        results while the remaining requests are still in flight.
+        """
+        workers = max(1, min(max_workers or self._pool_size, self._pool_size))
+
+        ex = ThreadPoolExecutor(max_workers=workers)
+        try:
+            fetch = self.get_service_details_raw
+            futures = {ex.submit(fetch, rid): rid for rid in rids}
+            for fut in as_completed(futures):
+                yield futures[fut], fut.result()
+        finally:
+            # if the consumer stops early (break / exception / generator closed),
+            # drop the queued requests instead of waiting for all of them; at most
+            # `workers` requests already in flight finish in the background
+            ex.shutdown(wait=False, cancel_futures=True)
+
+    def get_service_details_raw_many(
+        self,
+        rids: Iterable[str],
+        *,
+        max_workers: Optional[int] = None,
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Fetch several RIDs concurrently and return {rid: raw_or_None}.
+        """
+        return dict(self.iter_service_details_raw(rids, max_workers=max_workers))
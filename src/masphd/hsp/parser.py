@@ -1,7 +1,8 @@
 # src/masphd/hsp/parser.py
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Set
+import sys
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
 
 from masphd.darwin.station_pairs import CRS_TO_TIPLOC2, CRSS
 
@@ -9,9 +10,8 @@ from masphd.darwin.station_pairs import CRS_TO_TIPLOC2, CRSS
 def _clean_str(v: Any) -> Optional[str]:
     if v is None:
         return None
-    if isinstance(v, str):
-        s = v.strip()
-        return s or None
+    if v.__class__ is str:
+        return v.strip() or None
     s = str(v).strip()
     return s or None
 
@@ -24,12 +24,14 @@ def _pick_time_hhmm(v: Any) -> Optional[str]:
     return _clean_str(v)
 
 
-def _route_crs_set() -> Set[str]:
-    """
-    CRSS is a list like [Optional[str], ...] for the route in station_pairs.py.
-    Build a set of non-empty CRS strings.
-    """
-    return {c for c in (CRSS or []) if isinstance(c, str) and c.strip()}
+# CRSS is a list like [Optional[str], ...] for the route in station_pairs.py.
+# Non-empty CRS strings, interned so set hashing/compares against the
+# (also interned) seen CRS codes are cheap.
+_ROUTE_CRS: FrozenSet[str] = frozenset(
+    sys.intern(c) for c in (CRSS or []) if isinstance(c, str) and c.strip()
+)
+# hsp_tpls for a service that visits exactly the route stations
+_ROUTE_HSP_TPLS = ",".join(sorted(_ROUTE_CRS))
 
 
 def extract_service_locations(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -68,61 +70,77 @@ def extract_service_locations(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
     if not isinstance(locs, list):
         return []
 
-    # Determine service-level "main journey" based on CRS coverage
-    route_crs = _route_crs_set()
-    seen_crs: Set[str] = set()
-
+    # Single pass: keep (loc, cleaned + interned CRS) for usable locations.
+    # JSON decoders only produce plain dicts, so an exact type check suffices.
+    # Route stations not yet visited are ticked off in the same pass, which gives
+    # the service-level "main journey" flag without a separate subset check.
+    clean = _clean_str
+    intern = sys.intern
+    route_crs = _ROUTE_CRS
+    remaining = set(route_crs)
+    tick = remaining.discard
+    clean_locs: List[Tuple[Dict[str, Any], str]] = []
+    append = clean_locs.append
     for loc in locs:
-        if not isinstance(loc, dict):
-            continue
-        crs = _clean_str(loc.get("location"))
-        if crs:
-            seen_crs.add(crs)
+        if type(loc) is dict:
+            crs = clean(loc.get("location"))
+            if crs:
+                crs = intern(crs)
+                tick(crs)
+                append((loc, crs))
 
-    is_main_journey = 1 if (route_crs and route_crs.issubset(seen_crs)) else 0
+    seen_crs: Set[str] = {crs for _, crs in clean_locs}
+
+    covers_route = bool(route_crs) and not remaining
+    is_main_journey = 1 if covers_route else 0
 
     # Comma-separated sequence of all CRS locations in this service (sorted, unique)
     # (Keep stable ordering for easy diff/debugging.)
-    hsp_tpls = ",".join(sorted(seen_crs))
-
-    base: Dict[str, Any] = {
-        "rid": rid,
-        "ssd": ssd,
-        "toc_code": toc_code,
-        "is_main_journey": is_main_journey,
-        "hsp_tpls": hsp_tpls,
-    }
+    # seen covers the route and has the same size -> exactly the route
+    if covers_route and len(seen_crs) == len(route_crs):
+        hsp_tpls = _ROUTE_HSP_TPLS
+    else:
+        hsp_tpls = ",".join(sorted(seen_crs))
 
-    out: List[Dict[str, Any]] = []
-    for loc in locs:
-        if not isinstance(loc, dict):
-            continue
-
-        tpl = _clean_str(loc.get("location"))  # CRS
-        if not tpl:
-            continue
+    # Local aliases: avoid global/attribute lookups in the per-location loop
+    pick = _pick_time_hhmm
+    c2t = CRS_TO_TIPLOC2.get
 
-        item: Dict[str, Any] = dict(base)
-
-        # Darwin-like keys (note: tpl is CRS here by your confirmation)
-        item["tpl"] = tpl
-        item["pta"] = _pick_time_hhmm(loc.get("gbtt_pta"))
-        item["ptd"] = _pick_time_hhmm(loc.get("gbtt_ptd"))
-        item["ata"] = _pick_time_hhmm(loc.get("actual_ta"))
-        item["atd"] = _pick_time_hhmm(loc.get("actual_td"))
-        item["late_canc_reason"] = _clean_str(loc.get("late_canc_reason"))
+    out: List[Dict[str, Any]] = []
+    for loc, tpl in clean_locs:  # tpl is the CRS
+        # each time field is cleaned once and reused for the hsp_* mirror keys
+        pta = pick(loc.get("gbtt_pta"))
+        ptd = pick(loc.get("gbtt_ptd"))
+        ata = pick(loc.get("actual_ta"))
+        atd = pick(loc.get("actual_td"))
+
+        # one literal: service-level fields, then Darwin-like keys
+        # (note: tpl is CRS here by your confirmation)
+        item: Dict[str, Any] = {
+            "rid": rid,
+            "ssd": ssd,
+            "toc_code": toc_code,
+            "is_main_journey": is_main_journey,
+            "hsp_tpls": hsp_tpls,
+            "tpl": tpl,
+            "pta": pta,
+            "ptd": ptd,
+            "ata": ata,
+            "atd": atd,
+            "late_canc_reason": clean(loc.get("late_canc_reason")),
+        }
 
         # Helpful extra: route TIPLOC2 if this CRS is on your tracked route
-        t2 = CRS_TO_TIPLOC2.get(tpl)
+        t2 = c2t(tpl)
         if t2:
             item["tiploc2"] = t2
 
         # Keep raw fields (helps debugging and future endpoint changes)
         item["hsp_location"] = tpl
-        item["hsp_gbtt_pta"] = _pick_time_hhmm(loc.get("gbtt_pta"))
-        item["hsp_gbtt_ptd"] = _pick_time_hhmm(loc.get("gbtt_ptd"))
-        item["hsp_actual_ta"] = _pick_time_hhmm(loc.get("actual_ta"))
-        item["hsp_actual_td"] = _pick_time_hhmm(loc.get("actual_td"))
+        item["hsp_gbtt_pta"] = pta
+        item["hsp_gbtt_ptd"] = ptd
+        item["hsp_actual_ta"] = ata
+        item["hsp_actual_td"] = atd
 
         out.append(item)
 
@@ -0,0 +1,81 @@
+# src/masphd/io/pickle_cache.py
+"""
+Pickle sidecar caches for files that are slow to parse (config.yaml, tiploc.csv).
+
+A cache is only used while it is newer than its source file, and only if it
+passes a trust check: unpickling runs arbitrary code, so a cache that someone
+else could have written is never loaded. Caches of non-secret data (the
+station table) may be world-readable (0644); caches holding credentials
+(config.yaml) must be private (0600, require_private=True).
+"""
+
+from __future__ import annotations
+
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+
+def _trusted(st: os.stat_result, *, require_private: bool) -> bool:
+    """
+    Owned by this user and not writable by group/others; with require_private
+    also not readable by them (0600), for caches holding credentials.
+    """
+    getuid = getattr(os, "getuid", None)  # not on Windows
+    if getuid is not None and st.st_uid != getuid():
+        return False
+    return not st.st_mode & (0o077 if require_private else 0o022)
+
+
+def load_if_fresh(
+    cache: Path, source: Path, *, require_private: bool = False
+) -> Optional[Any]:
+    """
+    Unpickled contents of `cache` if it is newer than `source` and trusted,
+    else None. Any failure (missing, truncated, old or foreign pickle) is just
+    a cache miss.
+    """
+    try:
+        st = cache.stat()
+        if st.st_mtime_ns <= source.stat().st_mtime_ns:
+            return None
+        if not _trusted(st, require_private=require_private):
+            return None
+        with open(cache, "rb") as f:
+            return pickle.load(f)
+    except Exception:
+        return None
+
+
+def atomic_dump(cache: Path, obj: Any, mode: int = 0o644) -> bool:
+    """
+    Pickle `obj` to `cache` via a temp file + os.replace, so a process starting
+    concurrently never reads a half-written cache. The file gets `mode`
+    (use 0o600 for anything holding credentials).
+
+    Returns False if the cache could not be written (read-only checkout etc.);
+    callers then just rebuild from the source next time.
+    """
+    tmp = None
+    try:
+        # mkstemp creates the file 0600: never exposed wider than `mode`
+        fd, tmp = tempfile.mkstemp(
+            dir=cache.parent, prefix=cache.name + ".", suffix=".tmp"
+        )
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+        if mode != 0o600:
+            os.chmod(tmp, mode)
+        os.replace(tmp, cache)
+        tmp = None
+        return True
+    except OSError:
+        return False
+    finally:
+        if tmp is not None:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
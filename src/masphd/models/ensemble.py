@@ -2,11 +2,26 @@
 from __future__ import annotations
 
 import json
-from typing import Any, Dict, Optional, Tuple
+import logging
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
 
 import joblib
+import numpy as np
+
+# Optional dependency (recommended, in the "fast" extra):
+#   pip install orjson
+try:
+    import orjson as _orjson
+except Exception:
+    _orjson = None
 
 from masphd.io.paths import MODELS, WEIGHTS
+from masphd.models.transformers import register_legacy_pickle_names
+
+log = logging.getLogger(__name__)
 
 
 class WeightedEnsemblePredictor:
@@ -21,19 +36,41 @@ class WeightedEnsemblePredictor:
 
     Weights json format:
       { "FIRST_SECOND": { "MODELNAME": weight, ... }, ... }
+
+    Artifacts are loaded with mmap_mode="r", so large numpy arrays inside them are
+    memory-mapped read-only (lower RSS, page cache shared between processes).
+    This only takes effect for files saved uncompressed: joblib.dump(..., compress=0).
     """
 
-    def __init__(self, weights_filename: str = "model_weights.json"):
+    def __init__(self, weights_filename: str = "model_weights.json", *, max_pipelines: Optional[int] = None):
         self._weights_path = WEIGHTS / weights_filename
         self._weights = self._load_weights(self._weights_path)
 
-        # cache fitted pipelines only
-        self._pipe_cache: Dict[Tuple[str, str, str], Any] = {}
+        # per pair: (model names, weights array, total weight) for the weighted sum
+        self._weight_vectors: Dict[str, Tuple[Tuple[str, ...], np.ndarray, float]] = {
+            k: (tuple(v), np.fromiter(v.values(), dtype=np.float64, count=len(v)), sum(v.values()))
+            for k, v in self._weights.items()
+            if v
+        }
+
+        # artifact paths are built by string concatenation on this prefix
+        self._models_prefix = os.path.join(str(MODELS), "")
+
+        # cache fitted pipelines only; LRU-bounded when max_pipelines is set
+        self._max_pipelines = max_pipelines
+        self._pipe_cache: OrderedDict[Tuple[str, str, str], Any] = OrderedDict()
+
+        # artifacts saved from notebooks reference __main__.ColumnDropper
+        register_legacy_pickle_names()
 
     @staticmethod
     def _load_weights(path) -> Dict[str, Dict[str, float]]:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        if _orjson is not None:
+            with open(path, "rb") as f:
+                data = _orjson.loads(f.read())
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
         return {k: {m: float(w) for m, w in v.items()} for k, v in data.items()}
 
     def available_pairs(self) -> Dict[str, Dict[str, float]]:
@@ -41,14 +78,25 @@ class WeightedEnsemblePredictor:
 
     def _load_pipeline(self, first: str, second: str, model_name: str):
         """
-        Loads artifact from disk and returns a fitted pipeline that has .predict.
+        Returns the fitted pipeline for (first, second, model_name), loading it on
+        first use.
         """
         key = (first, second, model_name)
-        if key in self._pipe_cache:
-            return self._pipe_cache[key]
+        pipe = self._pipe_cache.get(key)
+        if pipe is not None:
+            self._pipe_cache.move_to_end(key, last=True)
+            return pipe
 
-        path = MODELS / f"{first}_{second}_{model_name}.joblib"
-        artifact = joblib.load(path)
+        pipe = self._read_pipeline(first, second, model_name)
+        self._cache_pipeline(key, pipe)
+        return pipe
+
+    def _read_pipeline(self, first: str, second: str, model_name: str):
+        """
+        Loads artifact from disk and returns a fitted pipeline that has .predict.
+        """
+        path = self._models_prefix + first + "_" + second + "_" + model_name + ".joblib"
+        artifact = joblib.load(path, mmap_mode="r")
 
         # Your artifacts: dict with "pipeline"
         if isinstance(artifact, dict):
@@ -63,30 +111,107 @@ class WeightedEnsemblePredictor:
         if not hasattr(pipe, "predict"):
             raise TypeError(f"Loaded object has no .predict(): {path} (type={type(pipe)})")
 
-        self._pipe_cache[key] = pipe
         return pipe
 
+    def _cache_pipeline(self, key: Tuple[str, str, str], pipe: Any) -> None:
+        self._pipe_cache[key] = pipe
+
+        # evict least recently used pipelines (drops their mmaps)
+        if self._max_pipelines is not None:
+            while len(self._pipe_cache) > self._max_pipelines:
+                self._pipe_cache.popitem(last=False)
+
+    def preload(self, pairs: Iterable[Tuple[str, str]], *, max_workers: int = 8) -> int:
+        """
+        Load all pipelines for the given station pairs (those that have weights)
+        before the stream starts, reading artifacts in parallel threads, so the
+        first decoded burst does not stall on disk I/O + unpickling.
+
+        Failures are logged and skipped (that pipeline is retried lazily on use).
+        Returns the number of pipelines loaded.
+        """
+        keys = []
+        for first, second in dict.fromkeys(pairs):
+            for model_name in self._weights.get(f"{first}_{second}", ()):
+                key = (first, second, model_name)
+                if key not in self._pipe_cache:
+                    keys.append(key)
+
+        # no point loading more than the cache will keep
+        if self._max_pipelines is not None:
+            keys = keys[: self._max_pipelines]
+        if not keys:
+            return 0
+
+        loaded = 0
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(keys)))) as ex:
+            futures = [ex.submit(self._read_pipeline, *key) for key in keys]
+            # cache is only touched from this thread
+            for key, fut in zip(keys, futures):
+                try:
+                    pipe = fut.result()
+                except Exception as e:
+                    log.warning("Preload failed for %s: %s", "_".join(key), e)
+                    continue
+                self._cache_pipeline(key, pipe)
+                loaded += 1
+
+        return loaded
+
     def predict_one(self, first: str, second: str, X_row: Any) -> Optional[float]:
         """
         Predict one output for a single-row input X_row (DataFrame recommended).
 
         Returns None if no weights exist for this station pair.
+        Per-model predictions are combined with one np.dot against the pair's
+        precomputed weight vector.
         """
-        pair_key = f"{first}_{second}"
-        wdict = self._weights.get(pair_key)
-        if not wdict:
+        entry = self._weight_vectors.get(f"{first}_{second}")
+        if entry is None:
             return None
 
-        weighted_pred = 0.0
-        total_w = 0.0
-
-        for model_name, w in wdict.items():
-            pipe = self._load_pipeline(first, second, model_name)
-            pred = float(pipe.predict(X_row)[0])
-            weighted_pred += w * pred
-            total_w += w
+        names, weights, total_w = entry
+        preds = np.fromiter(
+            (float(self._load_pipeline(first, second, name).predict(X_row)[0]) for name in names),
+            dtype=np.float64,
+            count=len(names),
+        )
+        weighted_pred = float(np.dot(weights, preds))
 
         if total_w > 0:
             weighted_pred /= total_w
 
         return weighted_pred
+
+    def predict_batch(self, pair_to_rows: Mapping[Tuple[str, str], Any]) -> Dict[Tuple[str, str], np.ndarray]:
+        """
+        Batched predict_one: {(first, second): X} -> {(first, second): preds}.
+
+        Each pipeline is called once on all rows of its pair (n rows -> (n,) array),
+        so a burst costs (#pairs * #models) predict calls instead of one per row.
+        Pairs with no weights are left out of the result.
+        """
+        out: Dict[Tuple[str, str], np.ndarray] = {}
+
+        for (first, second), X in pair_to_rows.items():
+            entry = self._weight_vectors.get(f"{first}_{second}")
+            if entry is None:
+                continue
+
+            names, weights, total_w = entry
+            n = len(X)
+
+            # one row of predictions per model, then weights @ preds
+            preds = np.empty((len(names), n), dtype=np.float64)
+            for j, name in enumerate(names):
+                pipe = self._load_pipeline(first, second, name)
+                preds[j] = np.asarray(pipe.predict(X), dtype=np.float64).reshape(n)
+
+            weighted = weights @ preds
+
+            if total_w > 0:
+                weighted /= total_w
+
+            out[(first, second)] = weighted
+
+        return out
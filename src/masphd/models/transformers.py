@@ -1,6 +1,7 @@
 # src/masphd/models/transformers.py
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass
 from typing import List, Optional
 
@@ -14,12 +15,22 @@ class ColumnDropper(BaseEstimator, TransformerMixin):
     Drops specified columns from a pandas DataFrame.
 
     This exists to support loading older joblib pipelines that were saved
-    with ColumnDropper defined in __main__ (e.g., in a notebook).
+    with ColumnDropper defined in __main__ (e.g., in a notebook). It is also the
+    class behind masphd.utils.model_utils.ColumnDropper: artifacts pickled from
+    that older `cols_to_drop` variant are mapped onto `columns` on load.
     """
 
     columns: Optional[List[str]] = None
     errors: str = "ignore"  # match pandas drop errors behaviour
 
+    def __setstate__(self, state):
+        if "cols_to_drop" in state and "columns" not in state:
+            state = dict(state)
+            cols = state.pop("cols_to_drop")
+            state["columns"] = list(cols) if cols else None
+            state.setdefault("errors", "ignore")
+        super().__setstate__(state)
+
     def fit(self, X, y=None):
         return self
 
@@ -27,6 +38,23 @@ class ColumnDropper(BaseEstimator, TransformerMixin):
         if self.columns is None:
             return X
         if isinstance(X, pd.DataFrame):
+            if self.errors == "ignore":
+                # nothing to drop (typical at predict time) -> pass the frame
+                # through instead of letting drop() copy it
+                present = [c for c in self.columns if c in X.columns]
+                if not present:
+                    return X
+                return X.drop(columns=present)
             return X.drop(columns=self.columns, errors=self.errors)
         # If it is not a DataFrame, just return unchanged (safe fallback)
         return X
+
+
+def register_legacy_pickle_names() -> None:
+    """
+    Expose ColumnDropper as __main__.ColumnDropper so notebook-era artifacts
+    unpickle from any entry point (no-op if __main__ already defines one).
+    """
+    main = sys.modules.get("__main__")
+    if main is not None and not hasattr(main, "ColumnDropper"):
+        main.ColumnDropper = ColumnDropper
@@ -32,13 +32,19 @@ class RecentSegmentCache:
         """
         self._tick += 1
 
-        state = self._od.get(seg_id)
+        od = self._od
+        state = od.get(seg_id)
         if state is None:
+            # new keys are appended at the MRU end already
             state = SegmentState()
-            self._od[seg_id] = state
+            od[seg_id] = state
 
-        # mark as most recently used by moving to end
-        self._od.move_to_end(seg_id, last=True)
+            # evict if too big
+            while len(od) > self.max_size:
+                od.popitem(last=False)
+        else:
+            # mark as most recently used by moving to end
+            od.move_to_end(seg_id, last=True)
 
         state.last_dep_time = dep_time
         state.last_kind = kind
@@ -48,10 +54,6 @@ class RecentSegmentCache:
         if has_actual and state.last_kind != "actual":
             state.last_kind = "actual"
 
-        # evict if too big
-        while len(self._od) > self.max_size:
-            self._od.popitem(last=False)
-
         return state
 
     def mark_actual_saved(self, seg_id: Hashable):
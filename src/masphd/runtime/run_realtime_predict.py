@@ -6,12 +6,11 @@ import logging
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
-import pandas as pd
-
 from masphd.io.paths import DATABASE
 from masphd.darwin.client import DarwinClient
 from masphd.darwin.extract_segments import extract_segments
 from masphd.darwin.realtime_filter import filter_segments_by_now
+from masphd.darwin.station_pairs import STATION_PAIRS
 from masphd.features.segment_features import SegmentFeatureBuilder
 from masphd.models.ensemble import WeightedEnsemblePredictor
 from masphd.runtime.recent_cache import RecentSegmentCache
@@ -60,6 +59,19 @@ def build_argparser() -> argparse.ArgumentParser:
         default="model_weights.json",
         help="Weights filename in WEIGHTS folder (default model_weights.json).",
     )
+    p.add_argument(
+        "--max-pipelines",
+        type=int,
+        default=None,
+        help="Max number of loaded model pipelines kept in memory (default unlimited).",
+    )
+    p.add_argument(
+        "--no-preload",
+        dest="preload",
+        action="store_false",
+        help="Load model pipelines lazily on first use instead of before connecting.",
+    )
+    p.set_defaults(preload=True)
     return p
 
 
@@ -74,7 +86,14 @@ def main():
     cache = RecentSegmentCache(max_size=args.cache_size)
     store = RealTimeSQLiteStore(DATABASE)
     feature_builder = SegmentFeatureBuilder(tz=LONDON)
-    ensemble = WeightedEnsemblePredictor(weights_filename=args.weights)
+    ensemble = WeightedEnsemblePredictor(weights_filename=args.weights, max_pipelines=args.max_pipelines)
+
+    # Cache state helpers: keep minimal assumptions about internal structure
+    # (resolved once here instead of hasattr() probes per segment)
+    get_last_dep_time = getattr(cache, "get_last_dep_time", None)
+    get_last_kind = getattr(cache, "get_last_kind", None)
+    get_actual_saved = getattr(cache, "get_actual_saved", None)
+    mark_actual_saved = getattr(cache, "mark_actual_saved", None)
 
     def on_decoded(forecasts, schedules, xml_bytes):
         now = datetime.now(LONDON)
@@ -103,28 +122,48 @@ def main():
         if not segs:
             return
 
-        for s in segs:
-            feat = feature_builder.build(s)
-            if feat is None:
-                continue
+        # one feature frame for the burst, one predict per (pair, model)
+        feats = feature_builder.build_batch(segs)
+        if feats.empty:
+            return
+
+        rows_by_pair = {}
+        for i in feats.index:
+            s = segs[i]
+            rows_by_pair.setdefault((s["first"], s["second"]), []).append(i)
 
-            X = pd.DataFrame([feat])
+        preds = ensemble.predict_batch(
+            {pair: feats.loc[rows] for pair, rows in rows_by_pair.items()}
+        )
+
+        yhat_by_row = {}
+        for pair, rows in rows_by_pair.items():
+            yhats = preds.get(pair)
+            if yhats is not None:
+                yhat_by_row.update(zip(rows, yhats.tolist()))
 
-            yhat = ensemble.predict_one(s["first"], s["second"], X)
+        # walk rows in the original segment order
+        for i, feat in feats.to_dict("index").items():
+            yhat = yhat_by_row.get(i)
             if yhat is None:
                 continue
 
+            s = segs[i]
+
             dep_time = s.get("dep_time_for_prediction")
             dep_kind = s.get("dep_time_kind")  # "actual" | "estimate" | "missing"
             has_actual = bool(s.get("has_actual_dep"))
             planned_dep = s.get("planned_dep")
+            rid = s.get("rid")
+            first = s.get("first")
+            second = s.get("second")
 
-            seg_id = (s.get("rid"), s.get("first"), s.get("second"), planned_dep)
+            # tuple of the segment's own str objects: their hashes are already cached
+            seg_id = (rid, first, second, planned_dep)
 
-            # Cache state helpers: keep minimal assumptions about internal structure
-            prev_dep = cache.get_last_dep_time(seg_id) if hasattr(cache, "get_last_dep_time") else None
-            prev_kind = cache.get_last_kind(seg_id) if hasattr(cache, "get_last_kind") else None
-            prev_actual_saved = cache.get_actual_saved(seg_id) if hasattr(cache, "get_actual_saved") else False
+            prev_dep = get_last_dep_time(seg_id) if get_last_dep_time is not None else None
+            prev_kind = get_last_kind(seg_id) if get_last_kind is not None else None
+            prev_actual_saved = get_actual_saved(seg_id) if get_actual_saved is not None else False
 
             cache.touch(seg_id, dep_time=dep_time, kind=dep_kind, has_actual=has_actual)
 
@@ -132,10 +171,10 @@ def main():
             should_insert_actual = has_actual and (not prev_actual_saved)
 
             rec = {
-                "rid": s.get("rid"),
+                "rid": rid,
                 "ssd": s.get("ssd"),
-                "first": s.get("first"),
-                "second": s.get("second"),
+                "first": first,
+                "second": second,
 
                 "planned_dep": planned_dep,
                 "dep_time": dep_time,
@@ -163,9 +202,8 @@ def main():
 
             if should_insert_actual:
                 inserted = store.insert_actual(rec)
-                if inserted:
-                    if hasattr(cache, "mark_actual_saved"):
-                        cache.mark_actual_saved(seg_id)
+                if inserted and mark_actual_saved is not None:
+                    mark_actual_saved(seg_id)
 
             if args.do_print:
                 flag = "ACTUAL" if has_actual else "EST"
@@ -182,6 +220,10 @@ def main():
                     f'pred={rec["predicted_delay"]:.2f} | cache={len(cache)}'
                 )
 
+    if args.preload:
+        n = ensemble.preload(STATION_PAIRS)
+        log.info("Preloaded %d model pipelines.", n)
+
     client = DarwinClient(on_decoded=on_decoded)
     client.connect()
 
@@ -196,8 +238,13 @@ def main():
     except KeyboardInterrupt:
         log.info("Stopped by user.")
     finally:
-        # drain=True ensures pending records are written before exit
-        store.close(drain=True, join_timeout=10.0)
+        try:
+            # stop receiving and decode the frames still queued while the store is open
+            # (run_for already does this; no-op then)
+            client.disconnect()
+        finally:
+            # drain=True ensures pending records are written before exit
+            store.close(drain=True, join_timeout=10.0)
 
     # If anything printed very late, flush can help, but close should prevent the crash.
     try:
@@ -1,45 +1,191 @@
 from __future__ import annotations
 
-from functools import lru_cache
-from typing import Optional
-
-import pandas as pd
+import csv
+import io
+import mmap
+import os
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass
+from sys import intern
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
 from masphd.io.paths import TIPLOC_MAP
+from masphd.io.pickle_cache import atomic_dump, load_if_fresh
 
 # Your canonical columns (as in the CSV)
 _COLS = ("NAME", "TIPLOC", "TIPLOC2", "CRS")
 
+# Built-index cache next to the CSV, refreshed whenever the CSV is newer.
+# Bump _CACHE_FORMAT when the pickled layout changes.
+_CACHE_PATH = TIPLOC_MAP.with_name(".tiploc.pkl")
+_CACHE_FORMAT = 6
+
+
+@dataclass(frozen=True, slots=True)
+class _Lookup:
+    """
+    Everything the lookups need, built once from the lookup CSV:
+
+      - rows: the columns as parallel tuples (row id -> value, None = empty cell)
+      - key_index: one key -> row id dict per column, so a lookup is two probes + one index:
+            rows["CRS"][key_index["TIPLOC"]["SOTON"]] -> "SOU"
+        If a key appears on several rows, the first row wins (same as the old scan).
+      - any_code: every non-empty code of any code column -> row id (first row wins)
+      - name_folded: casefolded NAME -> row id (first row wins), see get_value
 
-@lru_cache(maxsize=1)
-def _load_station_df() -> pd.DataFrame:
+    Never mutated after _build_lookup(), so one instance is shared by all threads
+    without locking.
     """
-    Load station lookup CSV once and cache it.
+
+    rows: Dict[str, Tuple[Optional[str], ...]]
+    key_index: Dict[str, Dict[str, int]]
+    any_code: Dict[str, int]
+    name_folded: Dict[str, int]
+
+
+# Set once by _load_lookup(); hot paths read the global directly
+# (`_LOOKUP or _load_lookup()`) instead of going through a cache wrapper.
+_LOOKUP: Optional[_Lookup] = None
+
+
+def _load_lookup() -> _Lookup:
+    """Load the lookup on first use and keep it in _LOOKUP."""
+    global _LOOKUP
+    if _LOOKUP is None:
+        _LOOKUP = _read_lookup()
+    return _LOOKUP
+
+
+def _read_lookup() -> _Lookup:
+    """
+    The built _Lookup is pickled to _CACHE_PATH, so later processes skip the
+    CSV parse + normalisation while the CSV is unchanged.
+    """
+    # not secret, so 0644 is fine; load_if_fresh still only trusts a sidecar
+    # owned by this user and not writable by anyone else
+    cached = load_if_fresh(_CACHE_PATH, TIPLOC_MAP)
+    if isinstance(cached, tuple) and len(cached) == 2:
+        fmt, lookup = cached
+        if fmt == _CACHE_FORMAT and isinstance(lookup, _Lookup):
+            return lookup
+
+    lookup = _build_lookup()
+    atomic_dump(_CACHE_PATH, (_CACHE_FORMAT, lookup), mode=0o644)
+    return lookup
+
+
+def _read_text() -> str:
+    """
+    Whole CSV as one str: the file is mapped read-only and decoded in one go,
+    instead of going through the buffered text-file line reader.
+    """
+    with open(TIPLOC_MAP, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ""  # mmap cannot map an empty file
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return str(mm, "utf-8-sig")
+
+
+def _build_lookup() -> _Lookup:
+    """
+    One csv pass over the station lookup CSV, then one pass per column.
 
     Expected columns:
         NAME, TIPLOC, TIPLOC2, CRS
+    Normalised for safe matching (codes uppercase, name kept as string).
+
+    Every value is sys.intern'ed, so a code is one str object shared by the
+    columns and indexes (the pickle sidecar keeps that sharing) and the strings
+    handed back by get_* compare by identity in callers' own dicts. Queries are
+    not interned: that would cost one more hash probe per lookup than it saves.
     """
-    df = pd.read_csv(TIPLOC_MAP)
+    reader = csv.reader(io.StringIO(_read_text(), newline=""))
+    header = next(reader, [])
 
     # Ensure required columns exist
-    missing = [c for c in _COLS if c not in df.columns]
+    missing = [c for c in _COLS if c not in header]
     if missing:
-        raise ValueError(f"TIPLOC_MAP is missing columns: {missing}. Found: {list(df.columns)}")
+        raise ValueError(f"TIPLOC_MAP is missing columns: {missing}. Found: {header}")
+
+    positions = [header.index(c) for c in _COLS]
+    width = max(positions) + 1
+    # skip blank lines, pad short rows
+    table = [row if len(row) >= width else row + [""] * (width - len(row)) for row in reader if row]
+
+    rows: Dict[str, Tuple[Optional[str], ...]] = {}
+    key_index: Dict[str, Dict[str, int]] = {}
+    for c, i in zip(_COLS, positions):
+        # one fused strip/upper/intern pass per column; empty cells -> None
+        if c == "NAME":
+            col = [intern(row[i].strip()) or None for row in table]
+        else:
+            col = [intern(row[i].strip().upper()) or None for row in table]
+        rows[c] = tuple(col)
+
+        # empty cells are never indexed; first row wins on duplicate keys
+        index: Dict[str, int] = {}
+        add = index.setdefault
+        for row_id, v in enumerate(col):
+            if v:
+                add(v, row_id)
+        key_index[c] = index
+
+    name_folded: Dict[str, int] = {}
+    add = name_folded.setdefault
+    for row_id, name in enumerate(rows["NAME"]):
+        if name:
+            add(name.casefold(), row_id)
+
+    any_code: Dict[str, int] = {}
+    add = any_code.setdefault
+    for row_id, (tiploc, tiploc2, crs) in enumerate(zip(rows["TIPLOC"], rows["TIPLOC2"], rows["CRS"])):
+        if tiploc:
+            add(tiploc, row_id)
+        if tiploc2:
+            add(tiploc2, row_id)
+        if crs:
+            add(crs, row_id)
+
+    return _Lookup(rows=rows, key_index=key_index, any_code=any_code, name_folded=name_folded)
+
+
+def prewarm(*, background: bool = False) -> None:
+    """
+    Load the CSV and build the lookup indexes now, so the first get_* call does
+    not pay for it. With background=True this runs in a daemon thread and returns
+    immediately (a lookup racing with it at worst builds the same indexes twice).
+
+    Importing masphd.darwin.station_pairs already does this (its route maps are
+    built at import time); this is for callers that use the lookup on its own.
+    """
+    if background:
+        threading.Thread(target=_load_lookup, name="station-lookup-prewarm", daemon=True).start()
+    else:
+        _load_lookup()
+
+
+def _strip(value: str) -> str:
+    return str(value).strip()
+
 
-    # Normalise for safe matching (codes uppercase, name kept as string)
-    df["TIPLOC"] = df["TIPLOC"].astype(str).str.strip().str.upper()
-    df["TIPLOC2"] = df["TIPLOC2"].astype(str).str.strip().str.upper()
-    df["CRS"] = df["CRS"].astype(str).str.strip().str.upper()
-    df["NAME"] = df["NAME"].astype(str).str.strip()
+def _upper_strip(value: str) -> str:
+    return str(value).strip().upper()
 
-    return df
 
+# Per-column key normalisers: codes are matched uppercase, NAME only stripped
+_NORMALISERS: Dict[str, Callable[[str], str]] = {
+    "NAME": _strip,
+    "TIPLOC": _upper_strip,
+    "TIPLOC2": _upper_strip,
+    "CRS": _upper_strip,
+}
 
-def _normalise_value(column: str, value: str) -> str:
-    v = str(value).strip()
-    if column in ("TIPLOC", "TIPLOC2", "CRS"):
-        v = v.upper()
-    return v
+# (by, target) -> (key normaliser, by, target) for the canonical column names;
+# anything else (lowercase, padded, invalid) goes through _check_cols.
+_DISPATCH: Dict[Tuple[str, str], Tuple[Callable[[str], str], str, str]] = {
+    (b, t): (_NORMALISERS[b], b, t) for b in _COLS for t in _COLS
+}
 
 
 def get_value(by: str, value: str, target: str) -> Optional[str]:
@@ -47,12 +193,58 @@ def get_value(by: str, value: str, target: str) -> Optional[str]:
     Generic lookup:
         target_value = get_value(by="TIPLOC", value="SOTON", target="TIPLOC2")
 
-    Returns None if not found.
+    Returns None if not found (or the target cell is empty).
     If multiple rows match (shouldn't happen), returns the first.
+
+    NAME is matched in two tiers: exact (stripped) first, then on a miss
+    case-insensitively (casefold), e.g. "Southampton Central" finds
+    "SOUTHAMPTON CENTRAL". Codes are always matched uppercase.
     """
     if not value:
         return None
 
+    entry = _DISPATCH.get((by, target))
+    if entry is None:
+        entry = _DISPATCH[_check_cols(by, target)]
+    norm, by, target = entry
+
+    lookup = _LOOKUP or _load_lookup()
+    key = norm(value)
+    i = lookup.key_index[by].get(key)
+    if i is None:
+        if by != "NAME":
+            return None
+        i = lookup.name_folded.get(key.casefold())
+        if i is None:
+            return None
+    return lookup.rows[target][i]
+
+
+def get_values_batch(by: str, values: Iterable[str], target: str) -> List[Optional[str]]:
+    """
+    Bulk get_value over many values, e.g. a DataFrame column:
+        df["CRS"] = get_values_batch("TIPLOC", df["TIPLOC"], "CRS")
+
+    Same per-value rules as get_value (falsy/unknown -> None, NAME casefold
+    fallback), but the columns are checked and the index resolved once, then it
+    is one dict.get per value.
+    Prefer this over df[col].apply(get_X_by_Y) / per-row loops.
+    """
+    norm, by, target = _DISPATCH.get((by, target)) or _DISPATCH[_check_cols(by, target)]
+    lookup = _LOOKUP or _load_lookup()
+    get = lookup.key_index[by].get
+    col = lookup.rows[target]
+
+    keys = [norm(v) if v else None for v in values]
+    ids = [None if k is None else get(k) for k in keys]
+    if by == "NAME":
+        folded = lookup.name_folded.get
+        ids = [folded(k.casefold()) if i is None and k is not None else i for k, i in zip(keys, ids)]
+    return [None if i is None else col[i] for i in ids]
+
+
+def _check_cols(by: str, target: str) -> Tuple[str, str]:
+    """Slow path for non-canonical column args: normalise, or raise ValueError."""
     by = by.strip().upper()
     target = target.strip().upper()
 
@@ -60,64 +252,131 @@ def get_value(by: str, value: str, target: str) -> Optional[str]:
         raise ValueError(f"Invalid 'by' column: {by}. Allowed: {_COLS}")
     if target not in _COLS:
         raise ValueError(f"Invalid 'target' column: {target}. Allowed: {_COLS}")
+    return by, target
 
-    df = _load_station_df()
-    key = _normalise_value(by, value)
 
-    row = df.loc[df[by] == key]
-    if row.empty:
-        return None
+def resolve_code(value: str) -> Optional[int]:
+    """
+    Row id of a TIPLOC, TIPLOC2 or CRS code (whichever column it is in), or None.
+    One dict probe instead of trying get_value once per code column:
+        r = resolve_code(x)
+        name = field(r, "NAME") if r is not None else None
 
-    out = row.iloc[0][target]
-    if pd.isna(out):
+    If a code appears on several rows/columns, the first row wins.
+    """
+    if not value:
         return None
-    return str(out).strip()
+    return (_LOOKUP or _load_lookup()).any_code.get(_upper_strip(value))
 
 
-# ---------------------------
-# Convenience functions
-# (all combinations)
-# ---------------------------
+def field(row_id: int, target: str) -> Optional[str]:
+    """Value of column `target` on row `row_id` (as returned by resolve_code)."""
+    rows = (_LOOKUP or _load_lookup()).rows
+    try:
+        col = rows[target]
+    except KeyError:
+        target = target.strip().upper()
+        if target not in _COLS:
+            raise ValueError(f"Invalid 'target' column: {target}. Allowed: {_COLS}") from None
+        col = rows[target]
+    return col[row_id]
 
-# By TIPLOC
-def get_name_by_tiploc(tiploc: str) -> Optional[str]:
-    return get_value("TIPLOC", tiploc, "NAME")
 
-def get_tiploc2_by_tiploc(tiploc: str) -> Optional[str]:
-    return get_value("TIPLOC", tiploc, "TIPLOC2")
+# Sorted search keys per column for stations_with_prefix, built on first use
+# (NAME uses the casefolded keys).
+_SORTED_KEYS: Dict[str, List[str]] = {}
+
 
-def get_crs_by_tiploc(tiploc: str) -> Optional[str]:
-    return get_value("TIPLOC", tiploc, "CRS")
+def stations_with_prefix(prefix: str, by: str = "TIPLOC") -> List[str]:
+    """
+    All distinct values of column `by` starting with `prefix`, in sorted order:
+        stations_with_prefix("WAT")              -> ["WATBECH", "WATCHET", ...]
+        stations_with_prefix("south", by="NAME") -> ["SOUTH ACTON", ...]
 
+    The prefix is normalised like a lookup key (codes uppercase; NAME matched
+    case-insensitively). Two bisects over a sorted key list, no column scan.
+    """
+    if not prefix:
+        return []
 
-# By TIPLOC2
-def get_name_by_tiploc2(tiploc2: str) -> Optional[str]:
-    return get_value("TIPLOC2", tiploc2, "NAME")
+    col = by.strip().upper()
+    if col not in _COLS:
+        raise ValueError(f"Invalid 'by' column: {col}. Allowed: {_COLS}")
 
-def get_tiploc_by_tiploc2(tiploc2: str) -> Optional[str]:
-    return get_value("TIPLOC2", tiploc2, "TIPLOC")
+    keys = _SORTED_KEYS.get(col)
+    lookup = _LOOKUP or _load_lookup()
+    if keys is None:
+        keys = _SORTED_KEYS[col] = sorted(lookup.name_folded if col == "NAME" else lookup.key_index[col])
 
-def get_crs_by_tiploc2(tiploc2: str) -> Optional[str]:
-    return get_value("TIPLOC2", tiploc2, "CRS")
+    p = _NORMALISERS[col](prefix)
+    if col == "NAME":
+        p = p.casefold()
+    if not p:
+        return []
 
+    hits = keys[bisect_left(keys, p):bisect_left(keys, p + "\U0010ffff")]
+    if col == "NAME":
+        names, name_folded = lookup.rows["NAME"], lookup.name_folded
+        return [names[name_folded[k]] for k in hits]
+    return hits
 
-# By CRS
-def get_name_by_crs(crs: str) -> Optional[str]:
-    return get_value("CRS", crs, "NAME")
 
-def get_tiploc_by_crs(crs: str) -> Optional[str]:
-    return get_value("CRS", crs, "TIPLOC")
+def _make(by: str, target: str) -> Callable[[str], Optional[str]]:
+    """
+    Specialised get_value(by, ..., target): the column names are fixed, so the
+    arg normalisation/validation and the index/column resolution happen once,
+    and a call only normalises the user value, does one dict.get + list index.
+    """
+    index: Optional[Dict[str, int]] = None
+    folded: Optional[Dict[str, int]] = None  # NAME casefold fallback, only for by="NAME"
+    col: Tuple[Optional[str], ...] = ()
+    norm = _NORMALISERS[by]
+
+    def lookup(value: str) -> Optional[str]:
+        nonlocal index, folded, col
+        if not value:
+            return None
+        if index is None:
+            lookup = _LOOKUP or _load_lookup()
+            index, col = lookup.key_index[by], lookup.rows[target]
+            if by == "NAME":
+                folded = lookup.name_folded
+        key = norm(value)
+        i = index.get(key)
+        if i is None:
+            if folded is None:
+                return None
+            i = folded.get(key.casefold())
+            if i is None:
+                return None
+        return col[i]
+
+    lookup.__name__ = lookup.__qualname__ = f"get_{target.lower()}_by_{by.lower()}"
+    lookup.__doc__ = f"get_value({by!r}, value, {target!r})"
+    return lookup
 
-def get_tiploc2_by_crs(crs: str) -> Optional[str]:
-    return get_value("CRS", crs, "TIPLOC2")
 
+# ---------------------------
+# Convenience functions
+# (all combinations)
+# ---------------------------
+
+# By TIPLOC
+get_name_by_tiploc = _make("TIPLOC", "NAME")
+get_tiploc2_by_tiploc = _make("TIPLOC", "TIPLOC2")
+get_crs_by_tiploc = _make("TIPLOC", "CRS")
 
-# By NAME (note: names may not be unique)
-def get_tiploc_by_name(name: str) -> Optional[str]:
-    return get_value("NAME", name, "TIPLOC")
+# By TIPLOC2
+get_name_by_tiploc2 = _make("TIPLOC2", "NAME")
+get_tiploc_by_tiploc2 = _make("TIPLOC2", "TIPLOC")
+get_crs_by_tiploc2 = _make("TIPLOC2", "CRS")
 
-def get_tiploc2_by_name(name: str) -> Optional[str]:
-    return get_value("NAME", name, "TIPLOC2")
+# By CRS
+get_name_by_crs = _make("CRS", "NAME")
+get_tiploc_by_crs = _make("CRS", "TIPLOC")
+get_tiploc2_by_crs = _make("CRS", "TIPLOC2")
 
-def get_crs_by_name(name: str) -> Optional[str]:
-    return get_value("NAME", name, "CRS")
+# By NAME (note: names may not be unique)
+get_tiploc_by_name = _make("NAME", "TIPLOC")
+get_tiploc2_by_name = _make("NAME", "TIPLOC2")
+get_crs_by_name = _make("NAME", "CRS")